@@ -0,0 +1,131 @@
+"""
+Cache of chatbot answers for the current FAR version, matched exactly or by question similarity
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+from config import Config
+from database import db_manager
+from far_index import vector_index
+from far_structure import SECTION_NUMBER_RE
+
+logger = logging.getLogger(__name__)
+
+def normalize_question(question: str) -> str:
+    """Lowercase words only, so case, spacing and punctuation do not matter"""
+    return " ".join(re.findall(r"\w+", question.lower()))
+
+class AnswerCache:
+    """LRU cache of answers with a TTL, scoped to one FAR version.
+
+    A question hits on an exact match after normalization, or when its embedding has a
+    cosine similarity of at least ANSWER_CACHE_SIMILARITY with a cached question that
+    cites the same section numbers ("52.212-4" and "52.212-5" embed almost identically).
+    All entries are dropped as soon as a new FAR version becomes the latest.
+    """
+
+    def __init__(self, max_entries: int = None, ttl: float = None, similarity: float = None):
+        self.max_entries = max_entries or Config.ANSWER_CACHE_SIZE
+        self.ttl = ttl or Config.ANSWER_CACHE_TTL
+        self.similarity = similarity or Config.ANSWER_CACHE_SIMILARITY
+        self.entries = OrderedDict()  # normalized question -> {'answer', 'vector', 'sections', 'expires'}
+        self.version_id = None
+        self.fac_number = None
+        self.hits_exact = 0
+        self.hits_semantic = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _check_version(self, version: Optional[Dict]):
+        """Clear the cache if the latest FAR version has changed (call with the lock held)"""
+        version_id = version['id'] if version else None
+        if version_id != self.version_id:
+            if self.entries:
+                logger.info(f"FAR version changed; dropping {len(self.entries)} cached answers")
+            self.entries.clear()
+            self.version_id = version_id
+            self.fac_number = version['fac_number'] if version else None
+
+    def _embed(self, question: str) -> Optional[np.ndarray]:
+        if not (vector_index.available and Config.OPENAI_API_KEY):
+            return None
+        try:
+            return vector_index.embed_query(question)[0]
+        except Exception as e:
+            logger.error(f"Question embedding failed: {e}")
+            return None
+
+    def get(self, question: str) -> Optional[str]:
+        """Cached answer to the question or a near-identical one, or None"""
+        key = normalize_question(question)
+        sections = frozenset(SECTION_NUMBER_RE.findall(question))
+        version = db_manager.get_latest_far_version()
+        now = time.monotonic()
+
+        with self._lock:
+            self._check_version(version)
+            entry = self.entries.get(key)
+            if entry and entry['expires'] > now:
+                self.entries.move_to_end(key)
+                self.hits_exact += 1
+                return entry['answer']
+            has_candidates = any(e['sections'] == sections for e in self.entries.values())
+
+        vector = self._embed(question) if has_candidates else None
+
+        with self._lock:
+            if vector is not None:
+                # Drop expired entries, then compare against every question citing the same sections at once
+                for expired in [k for k, e in self.entries.items() if e['expires'] <= now]:
+                    del self.entries[expired]
+                keys = [k for k, e in self.entries.items() if e['vector'] is not None and e['sections'] == sections]
+                if keys:
+                    scores = np.stack([self.entries[k]['vector'] for k in keys]) @ vector
+                    best = int(np.argmax(scores))
+                    if scores[best] >= self.similarity:
+                        self.entries.move_to_end(keys[best])
+                        self.hits_semantic += 1
+                        return self.entries[keys[best]]['answer']
+            self.misses += 1
+            return None
+
+    def put(self, question: str, answer: str, version_id: Optional[int]):
+        """Cache an answer generated from FAR version version_id"""
+        key = normalize_question(question)
+        vector = self._embed(question)
+        with self._lock:
+            # Skip answers built from a version that has since been replaced
+            if version_id is None or version_id != self.version_id:
+                return
+            self.entries[key] = {
+                'answer': answer,
+                'vector': vector,
+                'sections': frozenset(SECTION_NUMBER_RE.findall(question)),
+                'expires': time.monotonic() + self.ttl
+            }
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits_exact + self.hits_semantic + self.misses
+            return {
+                'enabled': Config.ANSWER_CACHE_ENABLED,
+                'fac_number': self.fac_number,
+                'entries': len(self.entries),
+                'hits_exact': self.hits_exact,
+                'hits_semantic': self.hits_semantic,
+                'misses': self.misses,
+                'hit_rate': (self.hits_exact + self.hits_semantic) / lookups * 100 if lookups else 0
+            }
+
+# Global answer cache instance
+answer_cache = AnswerCache()
@@ -4,16 +4,19 @@ Flask web application for FAR Bot with database integration
 """
 
 import os
+import json
 import time
 import uuid
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, Response, render_template, request, jsonify, session
 from flask_cors import CORS
 import logging
 
 from config import Config
 from simple_chatbot import SimpleFARChatbot
+from answer_cache import answer_cache
 from database import db_manager
+from far_index import save_and_index
 from scrape_far import FARScraper
 
 # Set up logging
@@ -35,6 +38,16 @@ def get_chatbot():
         chatbot = SimpleFARChatbot()
     return chatbot
 
+# Scraper shared by read-only requests, so they do not open an HTTP session each
+far_scraper = None
+
+def get_scraper():
+    """Get or create the shared scraper instance"""
+    global far_scraper
+    if far_scraper is None:
+        far_scraper = FARScraper()
+    return far_scraper
+
 @app.route('/')
 def index():
     """Main chat interface"""
@@ -50,14 +63,14 @@ def api_status():
     """Check system status"""
     try:
         chatbot = get_chatbot()
-        far_data = db_manager.get_latest_far_data()
+        latest_version = db_manager.get_latest_far_version()
         
         return jsonify({
             'ai_available': chatbot.openai_available,
-            'far_data_available': far_data is not None,
-            'latest_far_version': far_data['fac_number'] if far_data else None,
-            'latest_far_date': far_data['effective_date'] if far_data else None,
-            'last_scraped': far_data['scraped_at'] if far_data else None
+            'far_data_available': latest_version is not None,
+            'latest_far_version': latest_version['fac_number'] if latest_version else None,
+            'latest_far_date': latest_version['effective_date'] if latest_version else None,
+            'last_scraped': latest_version['scraped_at'] if latest_version else None
         })
     except Exception as e:
         logger.error(f"Status check error: {e}")
@@ -67,6 +80,41 @@ def api_status():
             'error': str(e)
         }), 500
 
+@app.route('/api/changes')
+def api_changes():
+    """Get what changed in the latest FAR version compared to the previous one"""
+    try:
+        changes = get_scraper().get_version_changes()
+        if not changes:
+            return jsonify({'error': 'No version changes recorded'}), 404
+        
+        return jsonify(changes)
+        
+    except Exception as e:
+        logger.error(f"Version changes error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/search')
+def api_search():
+    """Full-text search over the latest FAR"""
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'error': 'Query parameter q is required'}), 400
+        
+        limit = max(1, min(request.args.get('limit', 10, type=int), 100))
+        match_all = request.args.get('match', 'all') != 'any'
+        results = db_manager.search_far(query, limit=limit, match_all=match_all)
+        
+        return jsonify({
+            'query': query,
+            'results': results
+        })
+        
+    except Exception as e:
+        logger.error(f"Search error: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/chat', methods=['POST'])
 def api_chat():
     """Handle chat messages"""
@@ -89,9 +137,12 @@ def api_chat():
         # Start timing
         start_time = time.time()
         
-        # Get chatbot response
+        # Section lookups are answered with the verbatim text; everything else goes to the model
         chatbot = get_chatbot()
-        answer = chatbot.ask_question(question)
+        answer = chatbot.answer_from_sections(question) if Config.CLAUSE_FAST_PATH else None
+        fast_path = answer is not None
+        if not fast_path:
+            answer = chatbot.ask_question(question)
         
         # Calculate response time
         response_time_ms = int((time.time() - start_time) * 1000)
@@ -107,33 +158,45 @@ def api_chat():
         
         return jsonify({
             'answer': answer,
-            'response_time_ms': response_time_ms
+            'response_time_ms': response_time_ms,
+            'fast_path': fast_path
         })
         
     except Exception as e:
         logger.error(f"Chat error: {e}")
         return jsonify({'error': str(e)}), 500
 
+def page_limit(default: int) -> int:
+    """Page size from the request, clamped to 1..Config.MAX_PAGE_SIZE"""
+    return max(1, min(request.args.get('limit', default, type=int), Config.MAX_PAGE_SIZE))
+
+def stream_json_page(rows, fields, next_cursor):
+    """Stream rows as a JSON array one element at a time; the next page cursor goes in X-Next-Cursor"""
+    def generate():
+        yield '['
+        for i, row in enumerate(rows):
+            yield (',' if i else '') + json.dumps({field: row[field] for field in fields})
+        yield ']'
+    
+    response = Response(generate(), mimetype='application/json')
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
 @app.route('/api/history')
 def api_history():
-    """Get chat history"""
+    """Get chat history, a page at a time (pass X-Next-Cursor back as ?cursor=)"""
     try:
         session_id = session.get('session_id')
-        limit = request.args.get('limit', 50, type=int)
+        limit = page_limit(50)
         
-        history = db_manager.get_chat_history(session_id, limit)
+        history, next_cursor = db_manager.page_chat_history(session_id, limit, request.args.get('cursor'))
         
         # Format for frontend
-        formatted_history = []
-        for entry in history:
-            formatted_history.append({
-                'question': entry['question'],
-                'answer': entry['answer'],
-                'timestamp': entry['timestamp']
-            })
-        
-        return jsonify(formatted_history)
+        return stream_json_page(history, ('question', 'answer', 'timestamp'), next_cursor)
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"History error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -162,14 +225,34 @@ def api_scrape():
         start_time = time.time()
         
         # Run scraping
-        result_file = scraper.run_scrape()
+        latest_version = db_manager.get_latest_far_version()
+        result_file = scraper.run_scrape(latest_version)
+        
+        # Unchanged FAR already in the database: log it without loading the saved scrape
+        version_info = scraper.last_version_info
+        if (scraper.last_run_skipped and latest_version and
+            latest_version['fac_number'] == version_info.get('fac_number') and
+            latest_version['effective_date'] == version_info.get('effective_date')):
+            execution_time = time.time() - start_time
+            db_manager.log_scraping_result(
+                status='skipped',
+                fac_number=version_info.get('fac_number'),
+                effective_date=version_info.get('effective_date'),
+                execution_time_seconds=execution_time
+            )
+            
+            return jsonify({
+                'message': 'FAR version unchanged, scraping skipped',
+                'record_id': latest_version['id'],
+                'execution_time_seconds': execution_time,
+                'fac_number': version_info.get('fac_number'),
+                'effective_date': version_info.get('effective_date')
+            })
         
-        # Load and save to database
-        with open(result_file.replace('.txt', '.json'), 'r', encoding='utf-8') as f:
-            import json
-            far_data = json.load(f)
+        # Load, save to database and index for retrieval
+        far_data = scraper.load_far_data(result_file)
         
-        record_id = db_manager.save_far_data(far_data)
+        record_id = save_and_index(far_data)
         
         execution_time = time.time() - start_time
         
@@ -211,6 +294,7 @@ def api_admin_stats():
         
         return jsonify({
             'database_stats': stats,
+            'answer_cache': answer_cache.stats(),
             'recent_scraping_logs': scraping_logs
         })
         
@@ -218,6 +302,23 @@ def api_admin_stats():
         logger.error(f"Admin stats error: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/admin/logs')
+def api_admin_logs():
+    """Get scraping logs, a page at a time (pass X-Next-Cursor back as ?cursor=)"""
+    try:
+        logs, next_cursor = db_manager.page_scraping_logs(page_limit(100), request.args.get('cursor'))
+        
+        return stream_json_page(logs, (
+            'id', 'status', 'fac_number', 'effective_date', 'error_message',
+            'records_scraped', 'execution_time_seconds', 'timestamp'
+        ), next_cursor)
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Scraping logs error: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/admin/cleanup', methods=['POST'])
 def api_admin_cleanup():
     """Clean up old data"""
@@ -243,11 +344,12 @@ def api_admin_force_scrape():
         scraper = FARScraper()
         start_time = time.time()
         
-        # Force scrape by temporarily removing version check
-        far_data = scraper.scrape_all_far()
+        # Scrape every part again, whatever the saved version; the journal is cleared once it is stored
+        result_file = scraper.run_scrape(force=True)
+        far_data = scraper.load_far_data(result_file)
         
-        # Save to database
-        record_id = db_manager.save_far_data(far_data)
+        # Save to database and index for retrieval
+        record_id = save_and_index(far_data)
         
         execution_time = time.time() - start_time
         
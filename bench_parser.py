@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark FAR part parser backends against saved HTML fixtures
+"""
+
+import argparse
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from far_parser import available_backends, get_parser
+
+DEFAULT_FIXTURE_DIR = os.path.join("data", "fixtures")
+
+def fetch_fixtures(fixture_dir: str, count: int):
+    """Download up to count FAR part pages into fixture_dir"""
+    from scrape_far import BASE_URL, FARScraper
+    
+    os.makedirs(fixture_dir, exist_ok=True)
+    scraper = FARScraper(use_cache=False)
+    for link in sorted(scraper.get_far_links())[:count]:
+        url = BASE_URL + link if link.startswith("/") else link
+        with scraper.get_rate_limiter(url):
+            res = scraper.session.get(url, timeout=30)
+        res.raise_for_status()
+        path = os.path.join(fixture_dir, link.strip("/").replace("/", "_") + ".html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(res.text)
+        print(f"Saved {path}")
+    scraper.close()
+
+def load_fixtures(fixture_dir: str):
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(fixture_dir, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            fixtures.append((os.path.basename(path), f.read()))
+    return fixtures
+
+def max_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+def run_backend(backend_name: str, fixture_dir: str, repeat: int) -> dict:
+    """Benchmark one backend in this process (called in a fresh subprocess per backend)"""
+    fixtures = load_fixtures(fixture_dir)
+    parser = get_parser(backend_name)
+    total_bytes = sum(len(html.encode("utf-8")) for _, html in fixtures)
+    
+    # Warm up imports and caches before measuring
+    for name, html in fixtures[:1]:
+        parser.parse(html, name)
+    
+    rss_before = max_rss_mb()
+    tracemalloc.start()
+    start = time.perf_counter()
+    content_chars = 0
+    for _ in range(repeat):
+        for name, html in fixtures:
+            content_chars += len(parser.parse(html, name).content)
+    elapsed = time.perf_counter() - start
+    _, peak_python = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return {
+        "backend": backend_name,
+        "files": len(fixtures),
+        "mb": total_bytes * repeat / (1024 * 1024),
+        "seconds": elapsed,
+        "mb_per_second": total_bytes * repeat / (1024 * 1024) / elapsed if elapsed else 0,
+        "peak_python_mb": peak_python / (1024 * 1024),
+        "peak_rss_growth_mb": max_rss_mb() - rss_before,
+        "content_chars": content_chars // repeat
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FAR parser backends")
+    parser.add_argument("fixture_dir", nargs="?", default=DEFAULT_FIXTURE_DIR,
+                        help="directory of saved FAR part .html files")
+    parser.add_argument("--backends", default=",".join(available_backends()),
+                        help="comma-separated backends to run")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the fixtures per backend")
+    parser.add_argument("--fetch", type=int, default=0, metavar="N",
+                        help="download N FAR parts into the fixture directory first")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker:
+        print(json.dumps(run_backend(args.worker, args.fixture_dir, args.repeat)))
+        return
+    
+    if args.fetch:
+        fetch_fixtures(args.fixture_dir, args.fetch)
+    
+    if not load_fixtures(args.fixture_dir):
+        print(f"No .html fixtures found in {args.fixture_dir} (use --fetch N to download some)")
+        sys.exit(1)
+    
+    print(f"{'backend':<12}{'files':>7}{'MB/s':>10}{'seconds':>10}{'peak py MB':>12}{'peak RSS MB':>13}{'chars':>12}")
+    for backend_name in args.backends.split(","):
+        # A fresh interpreter per backend keeps peak memory figures independent
+        output = subprocess.run(
+            [sys.executable, __file__, args.fixture_dir, "--worker", backend_name, "--repeat", str(args.repeat)],
+            capture_output=True, text=True
+        )
+        if output.returncode != 0:
+            print(f"{backend_name:<12} failed: {output.stderr.strip().splitlines()[-1]}")
+            continue
+        result = json.loads(output.stdout)
+        print(f"{result['backend']:<12}{result['files']:>7}{result['mb_per_second']:>10.2f}"
+              f"{result['seconds']:>10.3f}{result['peak_python_mb']:>12.2f}"
+              f"{result['peak_rss_growth_mb']:>13.2f}{result['content_chars']:>12}")
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,68 @@ class Config:
     # Data directory
     DATA_DIR: str = os.getenv("DATA_DIR", "data")
     
+    # Scraper settings
+    SCRAPE_CONCURRENT: bool = os.getenv("SCRAPE_CONCURRENT", "true").lower() == "true"
+    SCRAPE_RATE_LIMIT: float = float(os.getenv("SCRAPE_RATE_LIMIT", "1.0"))  # requests per second per host
+    SCRAPE_BURST: int = int(os.getenv("SCRAPE_BURST", "1"))
+    SCRAPE_MAX_IN_FLIGHT: int = int(os.getenv("SCRAPE_MAX_IN_FLIGHT", "4"))
+    SCRAPE_RETRIES: int = int(os.getenv("SCRAPE_RETRIES", "3"))
+    SCRAPE_BACKOFF_FACTOR: float = float(os.getenv("SCRAPE_BACKOFF_FACTOR", "1.0"))
+    SCRAPE_HTTP_CACHE: bool = os.getenv("SCRAPE_HTTP_CACHE", "true").lower() == "true"
+    FAR_PARSER: str = os.getenv("FAR_PARSER", "auto")  # auto, selectolax, lxml, python, bs4
+    SCRAPE_STRUCTURED: bool = os.getenv("SCRAPE_STRUCTURED", "true").lower() == "true"
+    
+    # FAR version storage
+    FAR_VERSION_DELTAS: bool = os.getenv("FAR_VERSION_DELTAS", "true").lower() == "true"  # record what changed per version
+    FAR_COMPACT_VERSIONS: bool = os.getenv("FAR_COMPACT_VERSIONS", "true").lower() == "true"  # move legacy full copies into the version store
+    
+    # Database settings
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "")  # postgresql://... selects PostgreSQL, otherwise SQLite
+    DATABASE_PATH: str = os.getenv("DATABASE_PATH", "far_bot.db")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "8"))
+    DB_BUSY_TIMEOUT_MS: int = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+    DB_MMAP_SIZE: int = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))  # bytes, 0 disables
+    DB_CACHE_SIZE_KB: int = int(os.getenv("DB_CACHE_SIZE_KB", "65536"))  # page cache per connection
+    DB_CACHED_STATEMENTS: int = int(os.getenv("DB_CACHED_STATEMENTS", "256"))  # prepared statements per connection
+    DB_WRITE_BEHIND: bool = os.getenv("DB_WRITE_BEHIND", "false").lower() == "true"  # queue chat/log inserts
+    DB_WRITE_QUEUE_SIZE: int = int(os.getenv("DB_WRITE_QUEUE_SIZE", "1000"))
+    DB_WRITE_QUEUE_TIMEOUT: float = float(os.getenv("DB_WRITE_QUEUE_TIMEOUT", "1.0"))  # seconds to wait when full
+    DB_FLUSH_INTERVAL: float = float(os.getenv("DB_FLUSH_INTERVAL", "0.5"))  # seconds
+    DB_FLUSH_BATCH_SIZE: int = int(os.getenv("DB_FLUSH_BATCH_SIZE", "100"))
+    DB_CLEANUP_BATCH_SIZE: int = int(os.getenv("DB_CLEANUP_BATCH_SIZE", "500"))  # rows per cleanup transaction
+    DB_CLEANUP_PAUSE: float = float(os.getenv("DB_CLEANUP_PAUSE", "0.05"))  # seconds between cleanup batches
+    DB_VACUUM_PAGES: int = int(os.getenv("DB_VACUUM_PAGES", "2000"))  # free pages returned per vacuum run
+    FAR_CACHE_CHECK_INTERVAL: float = float(os.getenv("FAR_CACHE_CHECK_INTERVAL", "1.0"))  # seconds between staleness checks
+    STATS_CACHE_TTL: float = float(os.getenv("STATS_CACHE_TTL", "10"))  # seconds admin stats are reused
+    SEARCH_ALL_VERSIONS: bool = os.getenv("SEARCH_ALL_VERSIONS", "false").lower() == "true"  # index every FAC, not just the latest
+    
+    # Retrieval settings
+    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))  # inputs per embeddings request
+    EMBEDDING_CONCURRENCY: int = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))  # embeddings requests in flight
+    EMBEDDING_RETRIES: int = int(os.getenv("EMBEDDING_RETRIES", "5"))  # per request, with exponential backoff
+    VECTOR_INDEX_DIR: str = os.getenv("VECTOR_INDEX_DIR", os.path.join(os.path.dirname(DATABASE_PATH), "far_index"))
+    VECTOR_INDEX_BUILD_ON_STARTUP: bool = os.getenv("VECTOR_INDEX_BUILD_ON_STARTUP", "false").lower() == "true"  # embed a missing index at startup
+    EMBEDDING_CACHE_PATH: str = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(VECTOR_INDEX_DIR, "embeddings.db"))
+    VECTOR_CHUNK_CHARS: int = int(os.getenv("VECTOR_CHUNK_CHARS", "2000"))  # longer sections are split
+    VECTOR_CHUNK_OVERLAP: int = int(os.getenv("VECTOR_CHUNK_OVERLAP", "200"))
+    RETRIEVAL_TOP_K: int = int(os.getenv("RETRIEVAL_TOP_K", "6"))  # chunks sent to the LLM per question
+    RETRIEVAL_CANDIDATES: int = int(os.getenv("RETRIEVAL_CANDIDATES", "20"))  # results per search stage before fusion
+    RRF_K: int = int(os.getenv("RRF_K", "60"))  # reciprocal rank fusion constant
+    RETRIEVAL_LEXICAL_BUDGET_MS: int = int(os.getenv("RETRIEVAL_LEXICAL_BUDGET_MS", "250"))
+    RETRIEVAL_VECTOR_BUDGET_MS: int = int(os.getenv("RETRIEVAL_VECTOR_BUDGET_MS", "2000"))  # includes the query embedding call
+    RETRIEVAL_RERANK: bool = os.getenv("RETRIEVAL_RERANK", "true").lower() == "true"  # term-coverage and citation re-ranking
+    RAG_MAX_CONTEXT_CHARS: int = int(os.getenv("RAG_MAX_CONTEXT_CHARS", "12000"))
+    CLAUSE_FAST_PATH: bool = os.getenv("CLAUSE_FAST_PATH", "true").lower() == "true"  # answer "show me FAR x.y" without the LLM
+    FAST_PATH_MAX_SECTIONS: int = int(os.getenv("FAST_PATH_MAX_SECTIONS", "5"))
+    ANSWER_CACHE_ENABLED: bool = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+    ANSWER_CACHE_SIZE: int = int(os.getenv("ANSWER_CACHE_SIZE", "500"))  # answers kept, least recently used dropped first
+    ANSWER_CACHE_TTL: float = float(os.getenv("ANSWER_CACHE_TTL", "86400"))  # seconds
+    ANSWER_CACHE_SIMILARITY: float = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))  # cosine similarity for a match
+    
+    # API settings
+    MAX_PAGE_SIZE: int = int(os.getenv("MAX_PAGE_SIZE", "1000"))  # rows per /api/history or /api/admin/logs page
+    
     # Chat settings
     MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", "2000"))
     CHAT_HISTORY_LIMIT: int = int(os.getenv("CHAT_HISTORY_LIMIT", "10"))
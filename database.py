@@ -6,21 +6,90 @@ Database models and connection management for FAR Bot
 import sqlite3
 import json
 import os
-from datetime import datetime
-from typing import List, Dict, Optional, Tuple
+import queue
+import re
+import threading
+import time
+from typing import List, Dict, Iterator, Optional, Tuple
 from contextlib import contextmanager
 import logging
 
+from config import Config
+from far_structure import SECTION_NUMBER_RE, iter_sections, part_id_from_url
+from storage import HIGHLIGHT_END, HIGHLIGHT_START, StorageBackend, highlight_html
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class DatabaseManager:
-    """Manages database connections and operations"""
+class DatabaseManager(StorageBackend):
+    """Manages SQLite database connections and operations"""
+    
+    # Bumped whenever init_database gains a migration; stored in PRAGMA user_version
+    SCHEMA_VERSION = 8
+    
+    PLACEHOLDER = "?"
+    KEY_COMPARISON = "(timestamp, id) {op} (?, ?)"
+    
+    CHAT_INSERT_SQL = """
+        INSERT INTO chat_history (session_id, question, answer, user_ip, response_time_ms, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """
     
-    def __init__(self, db_path: str = "far_bot.db"):
+    SCRAPING_LOG_INSERT_SQL = """
+        INSERT INTO scraping_logs (status, fac_number, effective_date, error_message, 
+                                 records_scraped, execution_time_seconds, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """
+    
+    # Tables whose row counts are maintained in table_counts
+    COUNTED_TABLES = ("far_data", "chat_history", "scraping_logs")
+    
+    def __init__(self, db_path: str = "far_bot.db", pool_size: int = None):
+        super().__init__()
         self.db_path = db_path
+        self.pool_size = pool_size or Config.DB_POOL_SIZE
+        self._pool = queue.LifoQueue(maxsize=self.pool_size)
+        self._connections = set()
+        self._lock = threading.Lock()
+        self.fts_available = False
         self.init_database()
+        self.start_write_behind()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection configured for concurrent readers alongside a single writer"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=Config.DB_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,  # pooled connections move between threads, one user at a time
+            cached_statements=Config.DB_CACHED_STATEMENTS
+        )
+        conn.row_factory = sqlite3.Row  # Enable column access by name
+        
+        # Must precede anything that creates the file; existing databases are converted by _migrate
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        
+        # WAL lets readers proceed while a scrape is writing
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(Config.DB_BUSY_TIMEOUT_MS)}")
+        conn.execute(f"PRAGMA mmap_size={int(Config.DB_MMAP_SIZE)}")
+        conn.execute(f"PRAGMA cache_size=-{int(Config.DB_CACHE_SIZE_KB)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        # Rows removed by INSERT OR REPLACE also fire delete triggers, keeping the search indexes in sync
+        conn.execute("PRAGMA recursive_triggers=ON")
+        
+        with self._lock:
+            self._connections.add(conn)
+        return conn
+    
+    def _discard(self, conn: sqlite3.Connection):
+        with self._lock:
+            self._connections.discard(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
     
     def init_database(self):
         """Initialize database tables"""
@@ -68,135 +137,511 @@ class DatabaseManager:
                 )
             """)
             
+            # Create FAR parts and sections tables, one row per unit of a version
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS far_parts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    version_id INTEGER NOT NULL REFERENCES far_data(id),
+                    link TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    part_id TEXT,
+                    title TEXT,
+                    url TEXT,
+                    content TEXT NOT NULL,
+                    structure TEXT,  -- JSON string
+                    error TEXT,
+                    scraped_at TEXT,
+                    UNIQUE (version_id, link)
+                )
+            """)
+            
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS far_sections (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    version_id INTEGER NOT NULL REFERENCES far_data(id),
+                    section_id TEXT NOT NULL,
+                    part_id TEXT,
+                    subpart_id TEXT,
+                    title TEXT,
+                    url TEXT,
+                    text TEXT NOT NULL,
+                    UNIQUE (version_id, section_id)
+                )
+            """)
+            
+            self._create_search_indexes(cursor)
+            
             # Create indexes for better performance
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_far_latest ON far_data(is_latest)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_far_latest ON far_data(is_latest, scraped_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_far_parts_part ON far_parts(version_id, part_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_far_parts_position ON far_parts(version_id, position)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_far_scraped_at ON far_data(scraped_at)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_chat_timestamp ON chat_history(timestamp)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_chat_session ON chat_history(session_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_scraping_timestamp ON scraping_logs(timestamp)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_far_file_hash ON far_data(file_hash)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_chat_timestamp_id ON chat_history(timestamp, id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_chat_session_timestamp_id ON chat_history(session_id, timestamp, id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_scraping_timestamp_id ON scraping_logs(timestamp, id)")
+            
+            # Row counts and hourly scraping outcomes, kept current by triggers for the admin stats
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS table_counts (
+                    table_name TEXT PRIMARY KEY,
+                    row_count INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS scraping_hourly (
+                    hour TEXT PRIMARY KEY,  -- 'YYYY-MM-DD HH:00:00' UTC
+                    total INTEGER NOT NULL DEFAULT 0,
+                    successful INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            for table in self.COUNTED_TABLES:
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_count_insert AFTER INSERT ON {table}
+                    BEGIN
+                        UPDATE table_counts SET row_count = row_count + 1 WHERE table_name = '{table}';
+                    END
+                """)
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_count_delete AFTER DELETE ON {table}
+                    BEGIN
+                        UPDATE table_counts SET row_count = row_count - 1 WHERE table_name = '{table}';
+                    END
+                """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_scraping_hourly_insert AFTER INSERT ON scraping_logs
+                BEGIN
+                    INSERT OR IGNORE INTO scraping_hourly (hour) VALUES (strftime('%Y-%m-%d %H:00:00', NEW.timestamp));
+                    UPDATE scraping_hourly 
+                    SET total = total + 1, successful = successful + (NEW.status = 'success') 
+                    WHERE hour = strftime('%Y-%m-%d %H:00:00', NEW.timestamp);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_scraping_hourly_delete AFTER DELETE ON scraping_logs
+                BEGIN
+                    UPDATE scraping_hourly 
+                    SET total = total - 1, successful = successful - (OLD.status = 'success') 
+                    WHERE hour = strftime('%Y-%m-%d %H:00:00', OLD.timestamp);
+                END
+            """)
+            
+            # Generation counter bumped on any change to far_data, so every process can tell
+            # when its cached latest version is stale with a single-row read
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS far_generation (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    generation INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            cursor.execute("INSERT OR IGNORE INTO far_generation (id, generation) VALUES (1, 0)")
+            for event in ("INSERT", "DELETE", "UPDATE OF is_latest"):
+                name = event.split()[0].lower()
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_far_generation_{name} AFTER {event} ON far_data
+                    BEGIN
+                        UPDATE far_generation SET generation = generation + 1 WHERE id = 1;
+                    END
+                """)
             
             conn.commit()
+            
+            self._migrate(conn)
             logger.info("Database initialized successfully")
     
+    # External-content full-text indexes: (index, content table, indexed columns, extra row condition).
+    # Only the versions listed in far_search_versions are indexed; parts are indexed when they have no
+    # structure, since the sections of the others are indexed instead.
+    SEARCH_INDEXES = (
+        ("far_search", "far_sections", ("section_id", "title", "text"), ""),
+        ("far_part_search", "far_parts", ("title", "content"), "AND {row}.error IS NULL AND {row}.structure IS NULL")
+    )
+    
+    def _create_search_indexes(self, cursor: sqlite3.Cursor):
+        """Create the FTS5 indexes over FAR sections and parts, with triggers keeping them in sync"""
+        cursor.execute("CREATE TABLE IF NOT EXISTS far_search_versions (version_id INTEGER PRIMARY KEY)")
+        try:
+            for index, table, columns, condition in self.SEARCH_INDEXES:
+                cursor.execute(f"""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5(
+                        {', '.join(columns)},
+                        content = '{table}',
+                        content_rowid = 'id',
+                        tokenize = 'porter unicode61'
+                    )
+                """)
+                
+                # Each statement only touches the index when the row belongs to it
+                def indexed(row: str) -> str:
+                    return (f"{row}.version_id IN (SELECT version_id FROM far_search_versions) "
+                            f"{condition.format(row=row)}")
+                def add(row: str) -> str:
+                    return (f"INSERT INTO {index} (rowid, {', '.join(columns)}) "
+                            f"SELECT {row}.id, {', '.join(f'{row}.{column}' for column in columns)} WHERE {indexed(row)};")
+                def remove(row: str) -> str:
+                    return (f"INSERT INTO {index} ({index}, rowid, {', '.join(columns)}) "
+                            f"SELECT 'delete', {row}.id, {', '.join(f'{row}.{column}' for column in columns)} WHERE {indexed(row)};")
+                
+                for event, body in (("INSERT", add("NEW")), ("DELETE", remove("OLD")),
+                                    ("UPDATE", remove("OLD") + add("NEW"))):
+                    cursor.execute(f"""
+                        CREATE TRIGGER IF NOT EXISTS trg_{index}_{event.lower()} AFTER {event} ON {table}
+                        BEGIN
+                            {body}
+                        END
+                    """)
+            self.fts_available = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite FTS5 not available, FAR search disabled: {e}")
+    
+    def _migrate(self, conn: sqlite3.Connection):
+        """Bring an existing database up to SCHEMA_VERSION"""
+        cursor = conn.cursor()
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        
+        if version < 1:
+            # The old idx_far_latest covered is_latest only
+            cursor.execute("DROP INDEX IF EXISTS idx_far_latest")
+            cursor.execute("CREATE INDEX idx_far_latest ON far_data(is_latest, scraped_at)")
+            
+            # Move parts out of the parts_data JSON column, one version at a time
+            cursor.execute("SELECT id FROM far_data WHERE parts_data != ''")
+            for version_id in [row['id'] for row in cursor.fetchall()]:
+                row = cursor.execute("SELECT parts_data FROM far_data WHERE id = ?", (version_id,)).fetchone()
+                self._insert_parts(cursor, version_id, json.loads(row['parts_data']))
+                cursor.execute("UPDATE far_data SET parts_data = '' WHERE id = ?", (version_id,))
+                conn.commit()
+                logger.info(f"Migrated parts of FAR data record {version_id}")
+        
+        if version < 2:
+            latest = cursor.execute("SELECT id FROM far_data WHERE is_latest = TRUE ORDER BY scraped_at DESC LIMIT 1").fetchone()
+            if latest:
+                self._index_version(cursor, latest['id'])
+        
+        if version < 4:
+            # Seed the trigger-maintained rollups from the existing rows
+            cursor.execute("DELETE FROM table_counts")
+            for table in self.COUNTED_TABLES:
+                cursor.execute(f"INSERT INTO table_counts (table_name, row_count) SELECT '{table}', COUNT(*) FROM {table}")
+            cursor.execute("DELETE FROM scraping_hourly")
+            cursor.execute("""
+                INSERT INTO scraping_hourly (hour, total, successful)
+                SELECT strftime('%Y-%m-%d %H:00:00', timestamp), COUNT(*), SUM(status = 'success')
+                FROM scraping_logs 
+                GROUP BY 1
+            """)
+        
+        if version < 5 and cursor.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            # Switching an existing database to incremental auto-vacuum needs one full VACUUM,
+            # which cannot run inside a transaction
+            logger.info("Enabling incremental auto-vacuum (one-time VACUUM)...")
+            conn.commit()
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            cursor.execute("VACUUM")
+        
+        if version < 6:
+            # Superseded by the (timestamp, id) keyset indexes
+            cursor.execute("DROP INDEX IF EXISTS idx_chat_timestamp")
+            cursor.execute("DROP INDEX IF EXISTS idx_chat_session")
+            cursor.execute("DROP INDEX IF EXISTS idx_scraping_timestamp")
+        
+        if version < 7:
+            # Replace whole-scrape MD5 hashes (v3) and part-order-dependent hashes (v7) with
+            # content-only version hashes
+            cursor.execute("SELECT id, fac_number, effective_date FROM far_data")
+            for row in cursor.fetchall():
+                parts = conn.execute(
+                    "SELECT link, title, content FROM far_parts WHERE version_id = ?", (row['id'],)
+                )
+                version_hash = self._version_hash(row['fac_number'], row['effective_date'],
+                                                  ((part['link'], dict(part)) for part in parts))
+                cursor.execute("UPDATE far_data SET file_hash = ? WHERE id = ?", (version_hash, row['id']))
+        
+        if version < 8:
+            # Search indexes now read their text from far_sections and far_parts instead of keeping
+            # a copy, and far_data no longer stores the concatenated full text
+            if self.fts_available:
+                cursor.execute("DROP TABLE IF EXISTS far_search")
+                cursor.execute("DROP TABLE IF EXISTS far_part_search")
+                cursor.execute("DELETE FROM far_search_versions")
+                self._create_search_indexes(cursor)
+                latest = cursor.execute("SELECT id FROM far_data WHERE is_latest = TRUE ORDER BY scraped_at DESC LIMIT 1").fetchone()
+                if latest:
+                    self._index_version(cursor, latest['id'])
+            cursor.execute("UPDATE far_data SET full_text = '' WHERE full_text != ''")
+        
+        # Recorded last, so a failed VACUUM is retried on the next start (the steps above are idempotent)
+        cursor.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        conn.commit()
+    
+    def _insert_parts(self, cursor: sqlite3.Cursor, version_id: int, parts: Dict[str, Dict]):
+        """Insert the parts of a version, and their sections when they have a structure"""
+        for position, (link, part_data) in enumerate(parts.items()):
+            structure = part_data.get('structure')
+            cursor.execute("""
+                INSERT INTO far_parts (version_id, link, position, part_id, title, url, content,
+                                       structure, error, scraped_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                version_id,
+                link,
+                position,
+                structure['id'] if structure else part_id_from_url(link),
+                part_data.get('title'),
+                part_data.get('url'),
+                part_data.get('content', ''),
+                json.dumps(structure) if structure else None,
+                part_data.get('error'),
+                part_data.get('scraped_at')
+            ))
+            cursor.executemany("""
+                INSERT OR REPLACE INTO far_sections (version_id, section_id, part_id, subpart_id, title, url, text)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (
+                (version_id, section['id'], section['part'], section['subpart'],
+                 section['title'], section['url'], section['text'])
+                for section in iter_sections(part_data)
+            ))
+    
     @contextmanager
     def get_connection(self):
-        """Get database connection with proper error handling"""
-        conn = None
+        """Borrow a pooled database connection with proper error handling"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row  # Enable column access by name
             yield conn
         except Exception as e:
-            if conn:
+            try:
                 conn.rollback()
+            except sqlite3.Error:
+                # A broken connection is not returned to the pool
+                self._discard(conn)
+                conn = None
             logger.error(f"Database error: {e}")
             raise
         finally:
-            if conn:
-                conn.close()
+            if conn is not None:
+                # Never hand out a connection holding an open transaction (and its locks)
+                if conn.in_transaction:
+                    conn.rollback()
+                try:
+                    self._pool.put_nowait(conn)
+                except queue.Full:
+                    self._discard(conn)
+    
+    def close(self):
+        """Drain queued writes and close all pooled connections"""
+        super().close()
+        
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
+            self._discard(conn)
+        
+        with self._lock:
+            remaining = list(self._connections)
+        for conn in remaining:
+            self._discard(conn)
+        logger.info("Database connections closed")
     
     def save_far_data(self, far_data: Dict) -> int:
         """Save FAR data to database"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
-            # Mark all existing records as not latest
-            cursor.execute("UPDATE far_data SET is_latest = FALSE")
-            
-            # Calculate file hash for deduplication
+            # Calculate content hash for deduplication
             file_hash = self._calculate_hash(far_data)
             
             # Check if this data already exists
-            cursor.execute("SELECT id FROM far_data WHERE file_hash = ?", (file_hash,))
+            cursor.execute("SELECT id, is_latest FROM far_data WHERE file_hash = ? LIMIT 1", (file_hash,))
             existing = cursor.fetchone()
             
             if existing:
                 # Update existing record to be latest
-                cursor.execute("UPDATE far_data SET is_latest = TRUE WHERE id = ?", (existing['id'],))
+                if not existing['is_latest']:
+                    cursor.execute("UPDATE far_data SET is_latest = FALSE WHERE is_latest = TRUE")
+                    cursor.execute("UPDATE far_data SET is_latest = TRUE WHERE id = ?", (existing['id'],))
+                self._index_version(cursor, existing['id'])
                 conn.commit()
+                self.invalidate_far_cache()
                 logger.info(f"Updated existing FAR data record {existing['id']} as latest")
                 return existing['id']
             
-            # Insert new record
+            # Only the previous latest row needs flipping
+            cursor.execute("UPDATE far_data SET is_latest = FALSE WHERE is_latest = TRUE")
+            
+            # Insert new record; parts live in far_parts rather than the parts_data and full_text columns
             cursor.execute("""
                 INSERT INTO far_data (fac_number, effective_date, full_text, parts_data, file_hash, is_latest)
-                VALUES (?, ?, ?, ?, ?, TRUE)
+                VALUES (?, ?, '', '', ?, TRUE)
             """, (
                 far_data['version_info'].get('fac_number', ''),
                 far_data['version_info'].get('effective_date', ''),
-                far_data['full_text'],
-                json.dumps(far_data['parts']),
                 file_hash
             ))
             
             record_id = cursor.lastrowid
+            self._insert_parts(cursor, record_id, far_data['parts'])
+            self._index_version(cursor, record_id)
             conn.commit()
+            self.invalidate_far_cache()
             logger.info(f"Saved new FAR data with ID {record_id}")
             return record_id
     
-    def get_latest_far_data(self) -> Optional[Dict]:
-        """Get the latest FAR data from database"""
+    def _index_version(self, cursor: sqlite3.Cursor, version_id: int):
+        """Add a version to the search indexes if missing, dropping other versions unless all are kept"""
+        if not self.fts_available:
+            return
+        
+        if not Config.SEARCH_ALL_VERSIONS:
+            for row in cursor.execute("SELECT version_id FROM far_search_versions WHERE version_id != ?",
+                                      (version_id,)).fetchall():
+                self._unindex_version(cursor, row['version_id'])
+        if cursor.execute("SELECT 1 FROM far_search_versions WHERE version_id = ?", (version_id,)).fetchone():
+            return
+        
+        cursor.execute("INSERT INTO far_search_versions (version_id) VALUES (?)", (version_id,))
+        cursor.execute("""
+            INSERT INTO far_search (rowid, section_id, title, text)
+            SELECT id, section_id, title, text FROM far_sections WHERE version_id = ?
+        """, (version_id,))
+        cursor.execute("""
+            INSERT INTO far_part_search (rowid, title, content)
+            SELECT id, title, content FROM far_parts 
+            WHERE version_id = ? AND error IS NULL AND structure IS NULL
+        """, (version_id,))
+    
+    def _unindex_version(self, cursor: sqlite3.Cursor, version_id: int):
+        """Remove a version from the search indexes; external-content deletes need the indexed values"""
+        cursor.execute("""
+            INSERT INTO far_search (far_search, rowid, section_id, title, text)
+            SELECT 'delete', id, section_id, title, text FROM far_sections WHERE version_id = ?
+        """, (version_id,))
+        cursor.execute("""
+            INSERT INTO far_part_search (far_part_search, rowid, title, content)
+            SELECT 'delete', id, title, content FROM far_parts 
+            WHERE version_id = ? AND error IS NULL AND structure IS NULL
+        """, (version_id,))
+        cursor.execute("DELETE FROM far_search_versions WHERE version_id = ?", (version_id,))
+    
+    def _read_far_generation(self) -> int:
+        with self.get_connection() as conn:
+            return conn.execute("SELECT generation FROM far_generation WHERE id = 1").fetchone()['generation']
+    
+    def _query_latest_far_version(self) -> Optional[Dict]:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT * FROM far_data 
+                SELECT id, fac_number, effective_date, scraped_at FROM far_data 
                 WHERE is_latest = TRUE 
                 ORDER BY scraped_at DESC 
                 LIMIT 1
             """)
             
             row = cursor.fetchone()
-            if row:
-                return {
-                    'id': row['id'],
-                    'fac_number': row['fac_number'],
-                    'effective_date': row['effective_date'],
-                    'full_text': row['full_text'],
-                    'parts': json.loads(row['parts_data']),
-                    'scraped_at': row['scraped_at'],
-                    'version_info': {
-                        'fac_number': row['fac_number'],
-                        'effective_date': row['effective_date'],
-                        'scraped_at': row['scraped_at']
-                    }
-                }
+            return dict(row) if row else None
+    
+    def _part_row(self, row: sqlite3.Row) -> Dict:
+        part = dict(row)
+        part['structure'] = json.loads(part['structure']) if part['structure'] else None
+        return part
+    
+    def get_far_part(self, part: str, version_id: Optional[int] = None) -> Optional[Dict]:
+        """Get one part of a FAR version (default: latest) by part number or link"""
+        version_id = self._resolve_version(version_id)
+        if version_id is None:
             return None
+        
+        with self.get_connection() as conn:
+            row = conn.execute("""
+                SELECT * FROM far_parts 
+                WHERE version_id = ? AND (part_id = ? OR link = ?) 
+                ORDER BY position 
+                LIMIT 1
+            """, (version_id, part, part)).fetchone()
+            return self._part_row(row) if row else None
     
-    def save_chat_message(self, session_id: str, question: str, answer: str, 
-                         user_ip: str = None, response_time_ms: int = None) -> int:
-        """Save chat message to database"""
+    def iter_far_parts(self, version_id: Optional[int] = None) -> Iterator[Dict]:
+        """Stream the parts of a FAR version (default: latest) in scrape order"""
+        version_id = self._resolve_version(version_id)
+        if version_id is None:
+            return
+        
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO chat_history (session_id, question, answer, user_ip, response_time_ms)
-                VALUES (?, ?, ?, ?, ?)
-            """, (session_id, question, answer, user_ip, response_time_ms))
-            
-            record_id = cursor.lastrowid
-            conn.commit()
-            return record_id
+            cursor = conn.execute("SELECT * FROM far_parts WHERE version_id = ? ORDER BY position", (version_id,))
+            for row in cursor:
+                yield self._part_row(row)
     
-    def get_chat_history(self, session_id: str = None, limit: int = 50) -> List[Dict]:
-        """Get chat history from database"""
+    def get_far_section(self, section_id: str, version_id: Optional[int] = None) -> Optional[Dict]:
+        """Get one section of a FAR version (default: latest) by section number, e.g. 52.212-4"""
+        version_id = self._resolve_version(version_id)
+        if version_id is None:
+            return None
+        
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            if session_id:
-                cursor.execute("""
-                    SELECT * FROM chat_history 
-                    WHERE session_id = ? 
-                    ORDER BY timestamp DESC 
-                    LIMIT ?
-                """, (session_id, limit))
-            else:
-                cursor.execute("""
-                    SELECT * FROM chat_history 
-                    ORDER BY timestamp DESC 
-                    LIMIT ?
-                """, (limit,))
-            
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            row = conn.execute("""
+                SELECT * FROM far_sections WHERE version_id = ? AND section_id = ?
+            """, (version_id, section_id)).fetchone()
+            return dict(row) if row else None
+    
+    def _match_query(self, query: str, match_all: bool) -> str:
+        """Turn free text into an FTS5 query: section numbers as phrases, other words as quoted terms"""
+        terms = [f'"{" ".join(re.findall(r"[0-9]+", number))}"' for number in SECTION_NUMBER_RE.findall(query)]
+        words = re.findall(r"\w+", SECTION_NUMBER_RE.sub(" ", query))
+        terms += [f'"{word}"' for word in words]
+        return (" AND " if match_all else " OR ").join(terms)
+    
+    def search_far(self, query: str, limit: int = 10, version_id: Optional[int] = None,
+                   match_all: bool = True) -> List[Dict]:
+        """Full-text search over FAR sections of a version (default: latest), best BM25 match first"""
+        if not self.fts_available:
+            return []
+        match = self._match_query(query, match_all)
+        version_id = self._resolve_version(version_id)
+        if not match or version_id is None:
+            return []
+        
+        # Matches are marked with control characters and turned into <mark> tags after escaping
+        markers = (HIGHLIGHT_START, HIGHLIGHT_END)
+        with self.get_connection() as conn:
+            rows = conn.execute("""
+                SELECT 'section' AS kind, s.section_id AS ref_id, s.part_id, s.url,
+                       highlight(far_search, 0, ?, ?) || ' ' || coalesce(highlight(far_search, 1, ?, ?), '') AS title,
+                       snippet(far_search, 2, ?, ?, '…', 32) AS snippet,
+                       bm25(far_search, 5.0, 5.0, 1.0) AS score
+                FROM far_search JOIN far_sections s ON s.id = far_search.rowid
+                WHERE far_search MATCH ? AND s.version_id = ?
+                UNION ALL
+                SELECT 'part', p.link, p.part_id, p.url,
+                       coalesce(highlight(far_part_search, 0, ?, ?), ''),
+                       snippet(far_part_search, 1, ?, ?, '…', 32),
+                       bm25(far_part_search, 5.0, 1.0)
+                FROM far_part_search JOIN far_parts p ON p.id = far_part_search.rowid
+                WHERE far_part_search MATCH ? AND p.version_id = ?
+                ORDER BY score 
+                LIMIT ?
+            """, markers * 3 + (match, version_id) + markers * 2 + (match, version_id, limit)).fetchall()
+            return [dict(row, title=highlight_html(row['title']), snippet=highlight_html(row['snippet'])) for row in rows]
+    
+    def _iter_rows(self, sql: str, params: Tuple) -> Iterator[Dict]:
+        with self.get_connection() as conn:
+            for row in conn.execute(sql, params):
+                yield dict(row)
+    
+    def _execute_insert(self, sql: str, params: Tuple) -> Optional[int]:
+        with self.get_connection() as conn:
+            cursor = conn.execute(sql, params)
+            conn.commit()
+            return cursor.lastrowid
     
     def clear_chat_history(self, session_id: str = None) -> int:
         """Clear chat history"""
@@ -212,47 +657,14 @@ class DatabaseManager:
             conn.commit()
             return deleted_count
     
-    def log_scraping_result(self, status: str, fac_number: str = None, 
-                           effective_date: str = None, error_message: str = None,
-                           records_scraped: int = None, execution_time_seconds: float = None):
-        """Log scraping operation result"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO scraping_logs (status, fac_number, effective_date, error_message, 
-                                         records_scraped, execution_time_seconds)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (status, fac_number, effective_date, error_message, 
-                  records_scraped, execution_time_seconds))
-            conn.commit()
-    
-    def get_scraping_logs(self, limit: int = 100) -> List[Dict]:
-        """Get scraping logs from database"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM scraping_logs 
-                ORDER BY timestamp DESC 
-                LIMIT ?
-            """, (limit,))
-            
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
-    
-    def get_database_stats(self) -> Dict:
-        """Get database statistics"""
+    def _compute_stats(self) -> Dict:
+        """Database statistics from the trigger-maintained rollups"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
             # Count records in each table
-            cursor.execute("SELECT COUNT(*) as count FROM far_data")
-            far_data_count = cursor.fetchone()['count']
-            
-            cursor.execute("SELECT COUNT(*) as count FROM chat_history")
-            chat_count = cursor.fetchone()['count']
-            
-            cursor.execute("SELECT COUNT(*) as count FROM scraping_logs")
-            logs_count = cursor.fetchone()['count']
+            cursor.execute("SELECT table_name, row_count FROM table_counts")
+            counts = {row['table_name']: row['row_count'] for row in cursor.fetchall()}
             
             # Get latest scraping info
             cursor.execute("""
@@ -263,20 +675,20 @@ class DatabaseManager:
             """)
             latest_far = cursor.fetchone()
             
-            # Get recent scraping success rate
+            # Get recent scraping success rate (at most 169 hourly rows)
             cursor.execute("""
                 SELECT 
-                    COUNT(*) as total,
-                    SUM(CASE WHEN status = 'success' THEN 1 ELSE 0 END) as successful
-                FROM scraping_logs 
-                WHERE timestamp > datetime('now', '-7 days')
+                    COALESCE(SUM(total), 0) as total,
+                    COALESCE(SUM(successful), 0) as successful
+                FROM scraping_hourly 
+                WHERE hour >= strftime('%Y-%m-%d %H:00:00', 'now', '-7 days')
             """)
             recent_stats = cursor.fetchone()
             
             return {
-                'far_data_records': far_data_count,
-                'chat_messages': chat_count,
-                'scraping_logs': logs_count,
+                'far_data_records': counts.get('far_data', 0),
+                'chat_messages': counts.get('chat_history', 0),
+                'scraping_logs': counts.get('scraping_logs', 0),
                 'latest_far': dict(latest_far) if latest_far else None,
                 'recent_scraping_success_rate': (
                     recent_stats['successful'] / recent_stats['total'] * 100 
@@ -284,51 +696,97 @@ class DatabaseManager:
                 )
             }
     
-    def _calculate_hash(self, data: Dict) -> str:
-        """Calculate hash for data deduplication"""
-        import hashlib
-        content = json.dumps(data, sort_keys=True)
-        return hashlib.md5(content.encode()).hexdigest()
+    def _delete_in_batches(self, table: str, where: str, params: Tuple) -> int:
+        """Delete matching rows a batch at a time, committing and pausing between batches
+        
+        Each batch is its own short transaction, so chat inserts and other writers get
+        the write lock in between instead of waiting for the whole cleanup.
+        """
+        deleted = 0
+        while True:
+            with self.get_connection() as conn:
+                cursor = conn.execute(f"""
+                    DELETE FROM {table} WHERE rowid IN (
+                        SELECT rowid FROM {table} WHERE {where} LIMIT ?
+                    )
+                """, params + (Config.DB_CLEANUP_BATCH_SIZE,))
+                conn.commit()
+                batch_deleted = cursor.rowcount
+            
+            deleted += batch_deleted
+            if batch_deleted < Config.DB_CLEANUP_BATCH_SIZE:
+                return deleted
+            time.sleep(Config.DB_CLEANUP_PAUSE)
     
     def cleanup_old_data(self, days_to_keep: int = 30):
-        """Clean up old data to prevent database bloat"""
+        """Clean up old data to prevent database bloat, in small batches"""
+        cutoff = (f"-{int(days_to_keep)} days",)
+        
+        # Keep only latest FAR data and data from last N days; parts and sections go first
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Keep only latest FAR data and data from last N days
-            cursor.execute("""
-                DELETE FROM far_data 
+            old_versions = [row['id'] for row in conn.execute("""
+                SELECT id FROM far_data 
                 WHERE is_latest = FALSE 
-                AND scraped_at < datetime('now', '-{} days')
-            """.format(days_to_keep))
-            
-            far_deleted = cursor.rowcount
-            
-            # Clean up old chat history
-            cursor.execute("""
-                DELETE FROM chat_history 
-                WHERE timestamp < datetime('now', '-{} days')
-            """.format(days_to_keep))
-            
-            chat_deleted = cursor.rowcount
-            
-            # Clean up old scraping logs
-            cursor.execute("""
-                DELETE FROM scraping_logs 
-                WHERE timestamp < datetime('now', '-{} days')
-            """.format(days_to_keep))
-            
-            logs_deleted = cursor.rowcount
-            
+                AND scraped_at < datetime('now', ?)
+            """, cutoff).fetchall()]
+        
+        for version_id in old_versions:
+            self._delete_in_batches("far_parts", "version_id = ?", (version_id,))
+            self._delete_in_batches("far_sections", "version_id = ?", (version_id,))
+            if self.fts_available:
+                # The triggers have already removed the rows from the search indexes
+                with self.get_connection() as conn:
+                    conn.execute("DELETE FROM far_search_versions WHERE version_id = ?", (version_id,))
+                    conn.commit()
+            self._delete_in_batches("far_data", "id = ?", (version_id,))
+        far_deleted = len(old_versions)
+        
+        # Clean up old chat history
+        chat_deleted = self._delete_in_batches("chat_history", "timestamp < datetime('now', ?)", cutoff)
+        
+        # Clean up old scraping logs
+        logs_deleted = self._delete_in_batches("scraping_logs", "timestamp < datetime('now', ?)", cutoff)
+        with self.get_connection() as conn:
+            conn.execute("DELETE FROM scraping_hourly WHERE total <= 0")
             conn.commit()
-            
-            logger.info(f"Cleaned up {far_deleted} old FAR records, {chat_deleted} chat messages, {logs_deleted} scraping logs")
-            
-            return {
-                'far_deleted': far_deleted,
-                'chat_deleted': chat_deleted,
-                'logs_deleted': logs_deleted
-            }
+        
+        logger.info(f"Cleaned up {far_deleted} old FAR records, {chat_deleted} chat messages, {logs_deleted} scraping logs")
+        
+        return {
+            'far_deleted': far_deleted,
+            'chat_deleted': chat_deleted,
+            'logs_deleted': logs_deleted
+        }
+    
+    def incremental_vacuum(self, max_pages: int = None) -> int:
+        """Return up to max_pages free pages to the OS, one short step at a time; returns pages freed"""
+        max_pages = max_pages or Config.DB_VACUUM_PAGES
+        freed = 0
+        while freed < max_pages:
+            with self.get_connection() as conn:
+                before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if before == 0:
+                    break
+                step = min(Config.DB_CLEANUP_BATCH_SIZE, max_pages - freed)
+                conn.execute(f"PRAGMA incremental_vacuum({int(step)})").fetchall()
+                conn.commit()
+                after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            
+            if after >= before:
+                break
+            freed += before - after
+            time.sleep(Config.DB_CLEANUP_PAUSE)
+        
+        if freed:
+            logger.info(f"Incremental vacuum freed {freed} pages")
+        return freed
+
+def create_storage() -> StorageBackend:
+    """Storage backend selected by DATABASE_URL: PostgreSQL for postgres:// URLs, SQLite otherwise"""
+    if Config.DATABASE_URL.startswith(("postgres://", "postgresql://")):
+        from postgres_storage import PostgresStorage
+        return PostgresStorage(Config.DATABASE_URL)
+    return DatabaseManager(Config.DATABASE_PATH)
 
 # Global database manager instance
-db_manager = DatabaseManager()
+db_manager = create_storage()
@@ -0,0 +1,84 @@
+"""
+Embedding cache keyed by model and content hash, so unchanged FAR text is embedded only once
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable
+
+import numpy as np
+
+# Bound parameters per IN (...) query, below SQLite's default limit
+QUERY_BATCH_SIZE = 500
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """float32 vectors in a local SQLite file, one row per (model, SHA-256 of the embedded text)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, hash)
+            ) WITHOUT ROWID
+        """)
+        self.conn.commit()
+
+    def get_many(self, model: str, hashes: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Cached vectors for whichever of hashes are present"""
+        hashes = list(hashes)
+        found = {}
+        with self._lock:
+            for i in range(0, len(hashes), QUERY_BATCH_SIZE):
+                batch = hashes[i:i + QUERY_BATCH_SIZE]
+                rows = self.conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({','.join('?' * len(batch))})",
+                    [model, *batch]
+                )
+                for digest, vector in rows:
+                    found[digest] = np.frombuffer(vector, dtype=np.float32)
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, np.ndarray]):
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, hash, vector) VALUES (?, ?, ?)",
+                [(model, digest, np.asarray(vector, dtype=np.float32).tobytes()) for digest, vector in vectors.items()]
+            )
+            self.conn.commit()
+
+    def retain(self, model: str, hashes: Iterable[str]) -> int:
+        """Delete every vector except those of model with the given hashes; returns rows deleted"""
+        with self._lock:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep_hashes (hash TEXT PRIMARY KEY)")
+            self.conn.execute("DELETE FROM keep_hashes")
+            self.conn.executemany("INSERT OR IGNORE INTO keep_hashes (hash) VALUES (?)", [(digest,) for digest in hashes])
+            deleted = self.conn.execute(
+                "DELETE FROM embeddings WHERE model != ? OR hash NOT IN (SELECT hash FROM keep_hashes)", (model,)
+            ).rowcount
+            self.conn.execute("DELETE FROM keep_hashes")
+            self.conn.commit()
+            return deleted
+
+    def count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
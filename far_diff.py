@@ -0,0 +1,87 @@
+"""
+Part- and section-level change summaries between FAR versions
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+from far_structure import iter_sections
+
+def part_hash(part_data: Dict) -> str:
+    """Hash of a part's content, ignoring scrape timestamps"""
+    digest = hashlib.sha256()
+    digest.update(part_data.get("title", "").encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(part_data.get("content", "").encode("utf-8"))
+    return digest.hexdigest()
+
+def section_hashes(part_data: Dict) -> Dict[str, str]:
+    """Hash of every section's title and text in a structured part"""
+    return {
+        section["id"]: hashlib.sha256(f"{section['title']}\0{section['text']}".encode("utf-8")).hexdigest()
+        for section in iter_sections(part_data)
+    }
+
+def diff_versions(old_parts: Iterable[Tuple[str, Dict]], new_parts: Iterable[Tuple[str, Dict]]) -> Dict:
+    """Part- and section-level summary of what changed between two versions.
+
+    Both versions are streamed and only their hashes are kept in memory; the parts
+    themselves stay in the version store.
+    """
+    old_part_hashes = {}
+    old_section_hashes = {}
+    for link, part_data in old_parts:
+        old_part_hashes[link] = part_hash(part_data)
+        old_section_hashes.update(section_hashes(part_data))
+
+    new_links = set()
+    added_parts, changed_parts = [], []
+    new_section_hashes = {}
+    for link, part_data in new_parts:
+        new_links.add(link)
+        new_section_hashes.update(section_hashes(part_data))
+
+        old_hash = old_part_hashes.get(link)
+        if old_hash is None:
+            added_parts.append(link)
+        elif old_hash != part_hash(part_data):
+            changed_parts.append(link)
+
+    return {
+        "parts": {
+            "added": added_parts,
+            "changed": changed_parts,
+            "removed": [link for link in old_part_hashes if link not in new_links]
+        },
+        "sections": {
+            "added": sorted(sid for sid in new_section_hashes if sid not in old_section_hashes),
+            "changed": sorted(
+                sid for sid, digest in new_section_hashes.items()
+                if sid in old_section_hashes and old_section_hashes[sid] != digest
+            ),
+            "removed": sorted(sid for sid in old_section_hashes if sid not in new_section_hashes)
+        }
+    }
+
+def write_delta(delta_path: str, summary: Dict, base_path: str, version_info: Dict):
+    """Write a version's change summary relative to the version saved at base_path"""
+    delta = {"base_path": base_path, "version_info": version_info, "summary": summary}
+    with open(f"{delta_path}.tmp", "w", encoding="utf-8") as f:
+        f.write(json.dumps(delta, ensure_ascii=False) + "\n")
+    os.replace(f"{delta_path}.tmp", delta_path)
+
+def read_delta(delta_path: str) -> Dict:
+    """Read a change summary written by write_delta"""
+    with open(delta_path, "r", encoding="utf-8") as f:
+        return json.loads(f.readline())
+
+def summarize_changes(summary: Optional[Dict]) -> Dict:
+    """Counts of changed units for a delta summary"""
+    if not summary:
+        return {}
+    return {
+        level: {change: len(units) for change, units in changes.items()}
+        for level, changes in summary.items()
+    }
@@ -0,0 +1,297 @@
+"""
+Vector index over FAR sections for retrieving the passages relevant to a question
+"""
+
+import glob
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from config import Config
+from database import db_manager
+from embedding_cache import EmbeddingCache, text_hash
+from far_structure import iter_sections
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+logger = logging.getLogger(__name__)
+
+# Recent question embeddings kept, so the answer cache and retrieval share one embeddings call
+QUERY_CACHE_SIZE = 256
+
+def split_text(text: str, size: int, overlap: int) -> Iterator[tuple]:
+    """(start, end) windows of at most size characters, overlapping by overlap, broken at whitespace"""
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            # Prefer to break between words; fall back to a hard cut
+            space = text.rfind(" ", start + size // 2, end)
+            if space > start:
+                end = space
+        yield start, end
+        if end >= len(text):
+            return
+        # Start the next window at a word boundary inside the overlap
+        next_start = text.find(" ", end - overlap, end) + 1 if overlap else end
+        start = max(next_start or end, start + 1)
+
+def iter_chunks(version_id: int) -> Iterator[Dict]:
+    """Chunks of a FAR version: each section (split if long), or the whole part if it has no sections.
+
+    A chunk records where its text lives (section or part, and the character range)
+    rather than the text itself, so the saved index stays small.
+    """
+    for part in db_manager.iter_far_parts(version_id):
+        if part['error']:
+            continue
+        sections = list(iter_sections(part))
+        if sections:
+            sources = [('section', section['id'], section['title'], section['text']) for section in sections]
+        else:
+            sources = [('part', part['link'], part['title'] or '', part['content'])]
+
+        for kind, ref, title, text in sources:
+            for start, end in split_text(text, Config.VECTOR_CHUNK_CHARS, Config.VECTOR_CHUNK_OVERLAP):
+                yield {
+                    'kind': kind,
+                    'ref': ref,
+                    'part_id': part['part_id'],
+                    'title': title,
+                    'url': part['url'],
+                    'start': start,
+                    'end': end,
+                    'text': text[start:end]
+                }
+
+def embedding_input(chunk: Dict) -> str:
+    """Text sent to the embedding model: the heading gives short fragments their context"""
+    heading = f"FAR {chunk['ref']} {chunk['title']}" if chunk['kind'] == 'section' else chunk['title']
+    return f"{heading}\n{chunk['text']}"
+
+class FARVectorIndex:
+    """FAISS inner-product index of normalized chunk embeddings for one FAR version.
+
+    The index of version N is saved as far_<N>.faiss with its chunk list in far_<N>.json
+    under VECTOR_INDEX_DIR, and memory-mapped when loaded.
+    """
+
+    def __init__(self, index_dir: str = None):
+        self.index_dir = index_dir or Config.VECTOR_INDEX_DIR
+        self.index = None
+        self.meta: Optional[Dict] = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._cache = None
+        self._query_vectors = OrderedDict()
+
+    @property
+    def cache(self) -> EmbeddingCache:
+        """Embedding cache, opened on first use"""
+        with self._lock:
+            if self._cache is None:
+                self._cache = EmbeddingCache(Config.EMBEDDING_CACHE_PATH)
+            return self._cache
+
+    @property
+    def available(self) -> bool:
+        return faiss is not None
+
+    def _paths(self, version_id: int) -> tuple:
+        base = os.path.join(self.index_dir, f"far_{version_id}")
+        return f"{base}.faiss", f"{base}.json"
+
+    def embed(self, texts: List[str], use_cache: bool = True) -> np.ndarray:
+        """Normalized float32 embeddings of texts.
+
+        Only texts missing from the cache are sent, EMBEDDING_BATCH_SIZE per request with
+        up to EMBEDDING_CONCURRENCY requests in flight; the client retries throttled and
+        failed requests with exponential backoff. Each batch is cached as it arrives, so
+        an interrupted build resumes where it stopped.
+        """
+        model = Config.EMBEDDING_MODEL
+        hashes = [text_hash(text) for text in texts]
+        vectors = self.cache.get_many(model, set(hashes)) if use_cache else {}
+        missing = list({digest: text for digest, text in zip(hashes, texts) if digest not in vectors}.items())
+
+        if missing:
+            client = Config.get_openai_client()
+            if client is None:
+                raise RuntimeError("OpenAI API key is required to build embeddings")
+            client = client.with_options(max_retries=Config.EMBEDDING_RETRIES)
+
+            def embed_batch(batch):
+                response = client.embeddings.create(model=model, input=[text for _, text in batch])
+                return {digest: np.asarray(item.embedding, dtype=np.float32) for (digest, _), item in zip(batch, response.data)}
+
+            batches = [missing[i:i + Config.EMBEDDING_BATCH_SIZE] for i in range(0, len(missing), Config.EMBEDDING_BATCH_SIZE)]
+            if len(batches) > 1:
+                logger.info(f"Embedding {len(missing)} new texts in {len(batches)} requests ({len(vectors)} cached)")
+            with ThreadPoolExecutor(max_workers=max(1, Config.EMBEDDING_CONCURRENCY)) as executor:
+                for batch_vectors in executor.map(embed_batch, batches):
+                    if use_cache:
+                        self.cache.put_many(model, batch_vectors)
+                    vectors.update(batch_vectors)
+
+        matrix = np.stack([vectors[digest] for digest in hashes])
+        faiss.normalize_L2(matrix)
+        return matrix
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """1 x dimension embedding of a question, remembered for the last QUERY_CACHE_SIZE questions"""
+        with self._lock:
+            vector = self._query_vectors.get(query)
+            if vector is not None:
+                self._query_vectors.move_to_end(query)
+                return vector
+
+        vector = self.embed([query], use_cache=False)
+        with self._lock:
+            self._query_vectors[query] = vector
+            while len(self._query_vectors) > QUERY_CACHE_SIZE:
+                self._query_vectors.popitem(last=False)
+        return vector
+
+    def build(self, version: Dict = None) -> Optional[str]:
+        """Load the index of a FAR version (default: latest), embedding and saving it first if needed"""
+        if not self.available:
+            logger.warning("faiss is not installed; vector index disabled")
+            return None
+        version = version or db_manager.get_latest_far_version()
+        if not version:
+            return None
+
+        with self._build_lock:
+            index_path, meta_path = self._paths(version['id'])
+            if self.load(version['id']):
+                return index_path
+
+            chunks = list(iter_chunks(version['id']))
+            if not chunks:
+                logger.warning(f"No chunks to index for FAR version {version['id']}")
+                return None
+
+            logger.info(f"Indexing {len(chunks)} chunks of FAR {version['fac_number']}...")
+            inputs = [embedding_input(chunk) for chunk in chunks]
+            vectors = self.embed(inputs)
+            index = faiss.IndexFlatIP(vectors.shape[1])
+            index.add(vectors)
+
+            meta = {
+                'version_id': version['id'],
+                'fac_number': version['fac_number'],
+                'effective_date': version['effective_date'],
+                'model': Config.EMBEDDING_MODEL,
+                'dimension': int(vectors.shape[1]),
+                'chunks': [{key: value for key, value in chunk.items() if key != 'text'} for chunk in chunks]
+            }
+
+            # Write both files under temp names and rename, metadata last, so a reader never sees half an index
+            os.makedirs(self.index_dir, exist_ok=True)
+            faiss.write_index(index, f"{index_path}.tmp")
+            os.replace(f"{index_path}.tmp", index_path)
+            with open(f"{meta_path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(f"{meta_path}.tmp", meta_path)
+            logger.info(f"Saved vector index for FAR {version['fac_number']} to {index_path}")
+
+            self.load(version['id'])
+            self._remove_stale(version['id'])
+            self.cache.retain(Config.EMBEDDING_MODEL, (text_hash(text) for text in inputs))
+            return index_path
+
+    def load(self, version_id: int) -> Optional[str]:
+        """Memory-map the saved index of a version, if it exists and matches EMBEDDING_MODEL"""
+        index_path, meta_path = self._paths(version_id)
+        if not (self.available and os.path.exists(index_path) and os.path.exists(meta_path)):
+            return None
+
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get('model') != Config.EMBEDDING_MODEL:
+            logger.info(f"Vector index {index_path} was built with {meta.get('model')}; rebuild needed")
+            return None
+
+        index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+        with self._lock:
+            self.index, self.meta = index, meta
+        return index_path
+
+    def _remove_stale(self, version_id: int):
+        """Delete the saved indexes of other versions"""
+        keep = set(self._paths(version_id))
+        for path in glob.glob(os.path.join(self.index_dir, "far_*.faiss")) + glob.glob(os.path.join(self.index_dir, "far_*.json")):
+            if path not in keep:
+                os.remove(path)
+
+    def current(self):
+        """(index, meta) for the latest FAR version, or (None, None) if it is not indexed yet"""
+        version = db_manager.get_latest_far_version()
+        if not version:
+            return None, None
+
+        with self._lock:
+            if self.meta and self.meta['version_id'] == version['id']:
+                return self.index, self.meta
+
+        # A new version may have been indexed by another process; never build on the request path
+        if self.load(version['id']):
+            with self._lock:
+                return self.index, self.meta
+        return None, None
+
+    def chunk_text(self, chunk: Dict, version_id: int) -> Optional[str]:
+        """Read a chunk's text back from the database"""
+        if chunk['kind'] == 'section':
+            row = db_manager.get_far_section(chunk['ref'], version_id)
+            text = row['text'] if row else None
+        else:
+            row = db_manager.get_far_part(chunk['ref'], version_id)
+            text = row['content'] if row else None
+        return text[chunk['start']:chunk['end']] if text is not None else None
+
+    def search_chunks(self, query: str, k: int = None) -> List[Dict]:
+        """The k chunks of the latest FAR most similar to query, best first, without their text"""
+        index, meta = self.current()
+        if index is None:
+            return []
+
+        k = min(k or Config.RETRIEVAL_TOP_K, index.ntotal)
+        scores, ids = index.search(self.embed_query(query), k)
+        return [
+            dict(meta['chunks'][i], version_id=meta['version_id'], score=float(score))
+            for score, i in zip(scores[0], ids[0]) if i >= 0
+        ]
+
+    def search(self, query: str, k: int = None) -> List[Dict]:
+        """The k chunks of the latest FAR most similar to query, best first, with their text"""
+        results = []
+        for chunk in self.search_chunks(query, k):
+            chunk['text'] = self.chunk_text(chunk, chunk['version_id'])
+            if chunk['text'] is not None:
+                results.append(chunk)
+        return results
+
+# Global vector index instance
+vector_index = FARVectorIndex()
+
+def save_and_index(far_data: Dict) -> int:
+    """Save a scraped FAR version as the latest and build its vector index; returns the record ID.
+    
+    An indexing failure is logged rather than raised: retrieval falls back to full-text search.
+    """
+    record_id = db_manager.save_far_data(far_data)
+    try:
+        vector_index.build()
+    except Exception as e:
+        logger.error(f"Vector index build failed: {e}")
+    return record_id
@@ -0,0 +1,414 @@
+"""
+Pluggable HTML parser backends for FAR part pages
+"""
+
+import importlib.util
+from abc import ABC, abstractmethod
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+# Content regions to try, in priority order, as (tag, class) pairs
+CONTENT_SELECTORS: List[Tuple[str, Optional[str]]] = [
+    ("div", "field-item"),
+    ("article", None),
+    ("div", "content"),
+    ("main", None),
+    ("div", "main-content")
+]
+
+# Elements whose text never reaches the output
+SKIP_TAGS = {"script", "style", "template"}
+
+# Elements that start a new block of text
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "body", "br", "dd", "details", "dialog",
+    "div", "dl", "dt", "fieldset", "figcaption", "figure", "footer", "form",
+    "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "html", "li", "main",
+    "nav", "ol", "p", "pre", "section", "summary", "table", "tbody", "td", "tfoot",
+    "th", "thead", "tr", "ul"
+}
+
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "param", "source", "track", "wbr"
+}
+
+class ParsedPart:
+    """Title and block-level text of a FAR part page"""
+
+    def __init__(self, title: str, blocks: List[str]):
+        self.title = title
+        self.blocks = blocks
+
+    @property
+    def content(self) -> str:
+        """All text with whitespace collapsed to single spaces"""
+        return " ".join(self.blocks)
+
+class BlockCollector:
+    """Accumulates text strings and splits them into whitespace-normalized blocks"""
+
+    def __init__(self):
+        self.blocks: List[str] = []
+        self.current: List[str] = []
+
+    def add(self, text: str):
+        self.current.append(text)
+
+    def flush(self):
+        if self.current:
+            text = " ".join(" ".join(self.current).split())
+            if text:
+                self.blocks.append(text)
+            self.current = []
+
+    def finish(self) -> List[str]:
+        self.flush()
+        return self.blocks
+
+def join_title(strings) -> str:
+    """Join strings the way BeautifulSoup's get_text(strip=True) does"""
+    return "".join(s.strip() for s in strings if s.strip())
+
+def module_available(name: str) -> bool:
+    """Whether a module can be imported, without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ImportError:
+        # Raised when a parent package of a dotted name is missing
+        return False
+
+class ParserBackend(ABC):
+    """Base class for FAR part parser backends"""
+
+    name = "base"
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    @abstractmethod
+    def parse(self, html: str, fallback_title: str) -> ParsedPart:
+        """Title and content blocks of a part page; fallback_title is used when the page has none"""
+
+class TreeBackend(ParserBackend):
+    """Base class for backends that build a document tree and walk it for text"""
+
+    @abstractmethod
+    def _collect(self, node, collector: BlockCollector):
+        """Add the text under node to collector, flushing at block elements"""
+
+    def content_blocks(self, region, document) -> List[str]:
+        """Blocks of the content region, or of the whole document if there is no region or it has no text"""
+        for node in (region, document):
+            if node is None:
+                continue
+            collector = BlockCollector()
+            self._collect(node, collector)
+            blocks = collector.finish()
+            if blocks:
+                return blocks
+        return []
+
+class SelectolaxBackend(TreeBackend):
+    """Parser backend using selectolax's lexbor HTML5 parser"""
+
+    name = "selectolax"
+
+    @classmethod
+    def available(cls) -> bool:
+        return module_available("selectolax.lexbor")
+
+    def parse(self, html: str, fallback_title: str) -> ParsedPart:
+        from selectolax.lexbor import LexborHTMLParser
+
+        tree = LexborHTMLParser(html)
+        tree.strip_tags(list(SKIP_TAGS))
+
+        title_node = tree.css_first("h1") or tree.css_first("title")
+        title = join_title(self._iter_strings(title_node)) if title_node else fallback_title
+
+        region = None
+        for tag, css_class in CONTENT_SELECTORS:
+            region = tree.css_first(f"{tag}.{css_class}" if css_class else tag)
+            if region:
+                break
+
+        return ParsedPart(title, self.content_blocks(region, tree.root))
+
+    def _iter_strings(self, node):
+        for child in node.iter(include_text=True):
+            if child.tag == "-text":
+                yield child.text_content
+            elif child.tag not in ("_comment", "!doctype"):
+                yield from self._iter_strings(child)
+
+    def _collect(self, node, collector: BlockCollector):
+        for child in node.iter(include_text=True):
+            if child.tag == "-text":
+                collector.add(child.text_content)
+            elif child.tag not in ("_comment", "!doctype"):
+                block = child.tag in BLOCK_TAGS
+                if block:
+                    collector.flush()
+                self._collect(child, collector)
+                if block:
+                    collector.flush()
+
+class LxmlBackend(TreeBackend):
+    """Parser backend using lxml.html (libxml2)"""
+
+    name = "lxml"
+
+    @classmethod
+    def available(cls) -> bool:
+        return module_available("lxml.html")
+
+    def parse(self, html: str, fallback_title: str) -> ParsedPart:
+        import lxml.html
+        from lxml import etree
+
+        tree = lxml.html.document_fromstring(html)
+        etree.strip_elements(tree, *SKIP_TAGS, with_tail=False)
+
+        title_nodes = tree.xpath("(//h1)[1]") or tree.xpath("(//title)[1]")
+        title = join_title(self._iter_strings(title_nodes[0])) if title_nodes else fallback_title
+
+        region = None
+        for tag, css_class in CONTENT_SELECTORS:
+            if css_class:
+                xpath = f"(//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')])[1]"
+            else:
+                xpath = f"(//{tag})[1]"
+            matches = tree.xpath(xpath)
+            if matches:
+                region = matches[0]
+                break
+
+        return ParsedPart(title, self.content_blocks(region, tree))
+
+    def _iter_strings(self, element):
+        if isinstance(element.tag, str) and element.text:
+            yield element.text
+        for child in element:
+            yield from self._iter_strings(child)
+            if child.tail:
+                yield child.tail
+
+    def _collect(self, element, collector: BlockCollector):
+        # Comments and processing instructions have non-string tags; only their tails are text
+        if isinstance(element.tag, str):
+            if element.text:
+                collector.add(element.text)
+            for child in element:
+                block = isinstance(child.tag, str) and child.tag in BLOCK_TAGS
+                if block:
+                    collector.flush()
+                self._collect(child, collector)
+                if block:
+                    collector.flush()
+                if child.tail:
+                    collector.add(child.tail)
+
+class StopParsing(Exception):
+    pass
+
+class RegionExtractor(HTMLParser):
+    """Single-pass extractor that only keeps text for the title and candidate content regions"""
+
+    def __init__(self, selectors: List[Tuple[str, Optional[str]]] = CONTENT_SELECTORS):
+        super().__init__(convert_charrefs=True)
+        self.selectors = selectors
+        self.stack: List[str] = []
+        self.skip_depth = 0
+        # Per selector: None until seen, then the stack depth it opened at, then -1 once closed
+        self.region_depths: List[Optional[int]] = [None] * len(selectors)
+        self.regions: List[BlockCollector] = [BlockCollector() for _ in selectors]
+        self.document: Optional[BlockCollector] = BlockCollector()
+        self.titles: Dict[str, Optional[List[str]]] = {"h1": None, "title": None}
+        self.title_depths: Dict[str, int] = {}
+
+    def open_collectors(self) -> List[BlockCollector]:
+        collectors = [
+            collector for depth, collector in zip(self.region_depths, self.regions)
+            if depth is not None and depth >= 0
+        ]
+        if self.document is not None:
+            collectors.append(self.document)
+        return collectors
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+            return
+
+        if tag in BLOCK_TAGS:
+            for collector in self.open_collectors():
+                collector.flush()
+
+        if tag in VOID_TAGS:
+            return
+
+        self.stack.append(tag)
+        depth = len(self.stack)
+
+        if tag in self.titles and self.titles[tag] is None:
+            self.titles[tag] = []
+            self.title_depths[tag] = depth
+
+        classes = None
+        for i, (selector_tag, css_class) in enumerate(self.selectors):
+            if self.region_depths[i] is not None or tag != selector_tag:
+                continue
+            if css_class:
+                if classes is None:
+                    classes = (dict(attrs).get("class") or "").split()
+                if css_class not in classes:
+                    continue
+            self.region_depths[i] = depth
+            # Once a region matches, the whole-document fallback is no longer needed
+            self.document = None
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS:
+            for collector in self.open_collectors():
+                collector.flush()
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if tag not in self.stack:
+            return
+
+        # Pop up to and including the matching element, closing implicitly ended ones
+        while self.stack:
+            popped = self.stack.pop()
+            depth = len(self.stack) + 1
+
+            for i, region_depth in enumerate(self.region_depths):
+                if region_depth == depth:
+                    self.regions[i].flush()
+                    self.region_depths[i] = -1
+            for title_tag, title_depth in list(self.title_depths.items()):
+                if title_depth == depth:
+                    del self.title_depths[title_tag]
+
+            if popped == tag:
+                break
+
+        if tag in BLOCK_TAGS:
+            for collector in self.open_collectors():
+                collector.flush()
+
+        # The top-priority region is complete and the h1 is known: nothing later can change the result
+        if (self.region_depths and self.region_depths[0] == -1 and self.regions[0].blocks and
+                self.titles["h1"] is not None and not self.title_depths):
+            raise StopParsing()
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        for collector in self.open_collectors():
+            collector.add(data)
+        for title_tag in self.title_depths:
+            self.titles[title_tag].append(data)
+
+class PythonBackend(ParserBackend):
+    """Pure-Python parser backend built on the standard library html.parser"""
+
+    name = "python"
+
+    def extract(self, html: str, selectors: List[Tuple[str, Optional[str]]] = CONTENT_SELECTORS) -> RegionExtractor:
+        extractor = RegionExtractor(selectors)
+        try:
+            extractor.feed(html)
+            extractor.close()
+        except StopParsing:
+            pass
+        return extractor
+
+    def parse(self, html: str, fallback_title: str) -> ParsedPart:
+        extractor = self.extract(html)
+
+        title_strings = extractor.titles["h1"]
+        if title_strings is None:
+            title_strings = extractor.titles["title"]
+        title = join_title(title_strings) if title_strings is not None else fallback_title
+
+        for depth, collector in zip(extractor.region_depths, extractor.regions):
+            if depth is not None:
+                blocks = collector.finish()
+                if blocks:
+                    return ParsedPart(title, blocks)
+                # The region has no text: fall back to the whole document, which the first pass stopped collecting
+                return ParsedPart(title, self.extract(html, []).document.finish())
+
+        return ParsedPart(title, extractor.document.finish() if extractor.document else [])
+
+class BeautifulSoupBackend(TreeBackend):
+    """Reference backend building a full BeautifulSoup tree, as the scraper originally did"""
+
+    name = "bs4"
+
+    @classmethod
+    def available(cls) -> bool:
+        return module_available("bs4")
+
+    def parse(self, html: str, fallback_title: str) -> ParsedPart:
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, "html.parser")
+
+        title = soup.find("h1") or soup.find("title")
+        title_text = title.get_text(strip=True) if title else fallback_title
+
+        region = None
+        for tag, css_class in CONTENT_SELECTORS:
+            region = soup.select_one(f"{tag}.{css_class}" if css_class else tag)
+            if region:
+                break
+
+        return ParsedPart(title_text, self.content_blocks(region, soup))
+
+    def _collect(self, element, collector: BlockCollector):
+        from bs4 import CData, NavigableString
+
+        for child in element.children:
+            if isinstance(child, NavigableString):
+                # Script, Stylesheet and Comment are NavigableString subclasses that get_text() skips
+                if type(child) in (NavigableString, CData):
+                    collector.add(child)
+            else:
+                block = child.name in BLOCK_TAGS
+                if block:
+                    collector.flush()
+                self._collect(child, collector)
+                if block:
+                    collector.flush()
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (SelectolaxBackend, LxmlBackend, PythonBackend, BeautifulSoupBackend)
+}
+
+# Preference order when the backend is "auto"
+AUTO_ORDER = ["selectolax", "lxml", "python"]
+
+def available_backends() -> List[str]:
+    """Names of the parser backends importable in this environment"""
+    return [name for name, backend in BACKENDS.items() if backend.available()]
+
+def get_parser(name: str = "auto") -> ParserBackend:
+    """Get a parser backend by name, or the fastest available one for "auto" """
+    if name == "auto":
+        for candidate in AUTO_ORDER:
+            if BACKENDS[candidate].available():
+                return BACKENDS[candidate]()
+
+    backend = BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"Unknown FAR parser backend: {name}")
+    if not backend.available():
+        raise ImportError(f"FAR parser backend '{name}' is not installed")
+    return backend()
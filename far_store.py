@@ -0,0 +1,159 @@
+"""
+Content-addressed, compressed storage for FAR parts and version manifests
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+def part_payload(part_data: Dict) -> bytes:
+    """Canonical bytes of a part without its scrape timestamp, so identical parts share a blob"""
+    payload = {key: value for key, value in part_data.items() if key != "scraped_at"}
+    return json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class BlobStore:
+    """Stores each blob once under its SHA-256, compressed with zstd when available and gzip otherwise"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.extension = ".zst" if zstandard else ".gz"
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, digest: str, extension: Optional[str] = None) -> str:
+        return os.path.join(self.root, digest[:2], digest + (extension or self.extension))
+
+    def find(self, digest: str) -> Optional[str]:
+        """Path of a stored blob in whichever format it was written, or None"""
+        for extension in (".zst", ".gz"):
+            path = self.path_for(digest, extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put(self, data: bytes) -> str:
+        """Store data if not already present and return its digest"""
+        digest = hashlib.sha256(data).hexdigest()
+        if self.find(digest):
+            return digest
+
+        path = self.path_for(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if zstandard:
+            compressed = zstandard.ZstdCompressor(level=10).compress(data)
+        else:
+            compressed = gzip.compress(data, compresslevel=6)
+        with open(tmp_path, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        path = self.find(digest)
+        if path is None:
+            raise KeyError(f"Blob not found: {digest}")
+
+        with open(path, "rb") as f:
+            compressed = f.read()
+        if path.endswith(".zst"):
+            if zstandard is None:
+                raise ImportError("zstandard is required to read .zst blobs")
+            return zstandard.ZstdDecompressor().decompress(compressed)
+        return gzip.decompress(compressed)
+
+    def put_part(self, part_data: Dict) -> str:
+        return self.put(part_payload(part_data))
+
+    def get_part(self, digest: str) -> Dict:
+        return json.loads(self.get(digest))
+
+class LazyParts(Mapping):
+    """Read-only mapping of link -> part that decompresses a part only when it is accessed"""
+
+    def __init__(self, blob_store: BlobStore, entries: List[Dict]):
+        self.blob_store = blob_store
+        self.entries = {entry["link"]: entry for entry in entries}
+
+    def __getitem__(self, link: str) -> Dict:
+        entry = self.entries[link]
+        return dict(self.blob_store.get_part(entry["hash"]), scraped_at=entry.get("scraped_at"))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+class VersionStore:
+    """Version manifests under <data_dir>/versions pointing at part blobs under <data_dir>/blobs"""
+
+    MANIFEST_SUFFIX = ".manifest.json"
+
+    def __init__(self, data_dir: str):
+        self.versions_dir = os.path.join(data_dir, "versions")
+        self.blob_store = BlobStore(os.path.join(data_dir, "blobs"))
+        os.makedirs(self.versions_dir, exist_ok=True)
+
+    @classmethod
+    def is_manifest(cls, path: Optional[str]) -> bool:
+        return bool(path) and path.endswith(cls.MANIFEST_SUFFIX)
+
+    def save_version(self, name: str, version_info: Dict, parts: Iterable[Tuple[str, Dict]],
+                     on_part=None) -> str:
+        """Store each part as a blob and write the version manifest; returns the manifest path.
+
+        on_part(link, part_data) is called for every part as it is stored, so callers
+        can derive other outputs from the same single pass. Parts that failed to scrape
+        are listed in the manifest, and the version does not count as complete.
+        """
+        entries = []
+        failed = []
+        for link, part_data in parts:
+            if part_data.get("error"):
+                failed.append(link)
+            entries.append({
+                "link": link,
+                "hash": self.blob_store.put_part(part_data),
+                "title": part_data.get("title"),
+                "url": part_data.get("url"),
+                "scraped_at": part_data.get("scraped_at")
+            })
+            if on_part:
+                on_part(link, part_data)
+
+        manifest_path = os.path.join(self.versions_dir, name + self.MANIFEST_SUFFIX)
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version_info": version_info, "parts": entries, "failed": failed}, f, ensure_ascii=False)
+        os.replace(tmp_path, manifest_path)
+        return manifest_path
+
+    def read_manifest(self, manifest_path: str) -> Dict:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def load_parts(self, manifest_path: str) -> LazyParts:
+        return LazyParts(self.blob_store, self.read_manifest(manifest_path)["parts"])
+
+    def iter_parts(self, manifest_path: str) -> Iterator[Tuple[str, Dict]]:
+        """Stream (link, part_data), decompressing one part at a time"""
+        parts = self.load_parts(manifest_path)
+        for link in parts:
+            yield link, parts[link]
+
+    def is_complete(self, manifest_path: str) -> bool:
+        """Whether the manifest and every blob it references exist, with no part that failed to scrape"""
+        if not os.path.exists(manifest_path):
+            return False
+        manifest = self.read_manifest(manifest_path)
+        if manifest.get("failed"):
+            return False
+        return all(self.blob_store.find(entry["hash"]) for entry in manifest["parts"])
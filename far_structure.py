@@ -0,0 +1,127 @@
+"""
+Section-level structure extraction for scraped FAR parts
+"""
+
+import re
+from typing import Dict, Iterator, List, Optional
+
+# "Subpart 52.2 - Text of Provisions and Clauses"
+SUBPART_RE = re.compile(r"^Subpart\s+(\d+\.\d+)\s*(?:[-–—:]\s*)?(.*)$", re.IGNORECASE)
+
+# "52.212-4 Contract Terms and Conditions-Commercial Products..." or "15.404-1 Proposal analysis techniques."
+SECTION_RE = re.compile(r"^(\d{1,2}\.\d{3,5}(?:-\d+)*)\s+([A-Z\[(].*)$")
+
+# Section numbers anywhere in text, e.g. for citation lookups
+SECTION_NUMBER_RE = re.compile(r"\b(\d{1,2}\.\d{3,5}(?:-\d+)*)\b")
+
+PART_URL_RE = re.compile(r"/part-(\d+)", re.IGNORECASE)
+
+# Headings are short; longer blocks that happen to start with a number are body text
+MAX_HEADING_LENGTH = 300
+
+def part_id_from_url(url: str) -> Optional[str]:
+    match = PART_URL_RE.search(url)
+    return match.group(1) if match else None
+
+def subpart_id_for_section(section_id: str) -> str:
+    """Derive the subpart from a section number: 52.212-4 -> 52.2, 19.1503 -> 19.15"""
+    part, rest = section_id.split("-", 1)[0].split(".", 1)
+    return f"{part}.{rest[:-2] or '0'}"
+
+def extract_structure(part_id: Optional[str], title: str, blocks: List[str]) -> Dict:
+    """Build a Part -> Subpart -> Section -> paragraph hierarchy from block-level text.
+
+    Offsets are character positions in the part's content string, which is the
+    blocks joined by single spaces. Section IDs are FAR section numbers; when a
+    number appears more than once (e.g. the table of contents and the section
+    itself) the occurrence with the most text wins.
+    """
+    subpart_titles: Dict[str, str] = {}
+    subpart_headings: Dict[str, List[List[int]]] = {}
+    sections: Dict[str, Dict] = {}
+    current_section: Optional[Dict] = None
+    offset = 0
+
+    def close_section(end: int):
+        if current_section is not None:
+            current_section["end"] = end
+            existing = sections.get(current_section["id"])
+            if existing is None or (end - current_section["start"]) > (existing["end"] - existing["start"]):
+                sections[current_section["id"]] = current_section
+
+    for block in blocks:
+        start, end = offset, offset + len(block)
+        offset = end + 1
+
+        heading = block if len(block) <= MAX_HEADING_LENGTH else ""
+        subpart_match = SUBPART_RE.match(heading)
+        section_match = SECTION_RE.match(heading) if not subpart_match else None
+
+        if subpart_match:
+            close_section(start - 1)
+            current_section = None
+            subpart_id = subpart_match.group(1)
+            subpart_headings.setdefault(subpart_id, []).append([start, end])
+            if not subpart_titles.get(subpart_id):
+                subpart_titles[subpart_id] = subpart_match.group(2).strip()
+        elif section_match and (part_id is None or section_match.group(1).split(".")[0] == part_id):
+            close_section(start - 1)
+            current_section = {
+                "id": section_match.group(1),
+                "title": section_match.group(2).strip(),
+                "start": start,
+                "end": end,
+                "paragraphs": []
+            }
+        elif current_section is not None:
+            current_section["paragraphs"].append([start, end])
+
+    close_section(max(0, offset - 1))
+
+    subparts: Dict[str, Dict] = {}
+    for section in sorted(sections.values(), key=lambda section: section["start"]):
+        subpart_id = subpart_id_for_section(section["id"])
+        if subpart_id not in subparts:
+            subparts[subpart_id] = {"id": subpart_id, "title": subpart_titles.get(subpart_id, ""), "start": 0, "end": 0, "sections": []}
+        subparts[subpart_id]["sections"].append(section)
+
+    for subpart_id, headings in subpart_headings.items():
+        if subpart_id not in subparts:
+            subparts[subpart_id] = {"id": subpart_id, "title": subpart_titles.get(subpart_id, ""), "start": 0, "end": 0, "sections": []}
+
+    # A subpart spans from its last heading before its first section through its last section
+    for subpart_id, subpart in subparts.items():
+        headings = subpart_headings.get(subpart_id, [])
+        if subpart["sections"]:
+            first_start = subpart["sections"][0]["start"]
+            preceding = [heading for heading in headings if heading[0] <= first_start]
+            subpart["start"] = preceding[-1][0] if preceding else first_start
+            subpart["end"] = max(section["end"] for section in subpart["sections"])
+        else:
+            subpart["start"], subpart["end"] = headings[-1]
+
+    return {
+        "id": part_id,
+        "title": title,
+        "subparts": sorted(subparts.values(), key=lambda subpart: subpart["start"])
+    }
+
+def iter_sections(part_data: Dict) -> Iterator[Dict]:
+    """Yield flat section records (with their text) from a scraped part that has a structure"""
+    structure = part_data.get("structure")
+    if not structure:
+        return
+
+    content = part_data.get("content", "")
+    for subpart in structure["subparts"]:
+        for section in subpart["sections"]:
+            yield {
+                "id": section["id"],
+                "title": section["title"],
+                "part": structure["id"],
+                "subpart": subpart["id"],
+                "url": part_data.get("url"),
+                "start": section["start"],
+                "end": section["end"],
+                "text": content[section["start"]:section["end"]]
+            }
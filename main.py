@@ -12,6 +12,7 @@ import time
 
 from config import Config
 from database import db_manager
+from far_index import save_and_index, vector_index
 from scheduler import start_scheduler, stop_scheduler, get_scheduler_status
 from app import app
 
@@ -39,12 +40,37 @@ class FARBotApplication:
         db_manager.init_database()
         
         # Check if we have any FAR data
-        latest_data = db_manager.get_latest_far_data()
-        if not latest_data:
+        latest_version = db_manager.get_latest_far_version()
+        if not latest_version:
             logger.info("No FAR data found in database. Running initial scrape...")
             self.run_initial_scrape()
         else:
-            logger.info(f"Found existing FAR data: {latest_data['fac_number']} ({latest_data['effective_date']})")
+            logger.info(f"Found existing FAR data: {latest_version['fac_number']} ({latest_version['effective_date']})")
+        
+        # Map the saved vector index without blocking startup
+        Thread(target=self.load_vector_index, daemon=True).start()
+    
+    def load_vector_index(self):
+        """Memory-map the saved vector index of the latest FAR version.
+        
+        A missing index is only embedded here when VECTOR_INDEX_BUILD_ON_STARTUP is set, since
+        that embeds the whole FAR; otherwise it is built when the next FAR version is saved.
+        """
+        latest_version = db_manager.get_latest_far_version()
+        if not latest_version:
+            return
+        try:
+            if vector_index.load(latest_version['id']):
+                logger.info("Vector index ready")
+            elif Config.VECTOR_INDEX_BUILD_ON_STARTUP:
+                logger.info("No vector index for the latest FAR version; building it...")
+                if vector_index.build(latest_version):
+                    logger.info("Vector index ready")
+            else:
+                logger.warning("No vector index for the latest FAR version; using keyword search until the next "
+                               "FAR version is saved (set VECTOR_INDEX_BUILD_ON_STARTUP=true to build it now)")
+        except Exception as e:
+            logger.warning(f"Vector index unavailable, using keyword search: {e}")
     
     def run_initial_scrape(self):
         """Run initial scraping to populate database"""
@@ -56,11 +82,9 @@ class FARBotApplication:
             result_file = scraper.run_scrape()
             
             # Load and save to database
-            with open(result_file.replace('.txt', '.json'), 'r', encoding='utf-8') as f:
-                import json
-                far_data = json.load(f)
+            far_data = scraper.load_far_data(result_file)
             
-            record_id = db_manager.save_far_data(far_data)
+            record_id = save_and_index(far_data)
             logger.info(f"Initial scraping completed. Saved with ID: {record_id}")
             
         except Exception as e:
@@ -156,6 +180,12 @@ class FARBotApplication:
         except Exception as e:
             logger.error(f"Error stopping scheduler: {e}")
         
+        # Close pooled database connections
+        try:
+            db_manager.close()
+        except Exception as e:
+            logger.error(f"Error closing database: {e}")
+        
         # Note: Flask app will stop when the process exits
         logger.info("FAR Bot Application shutdown complete")
 
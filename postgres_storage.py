@@ -0,0 +1,572 @@
+"""
+PostgreSQL storage backend for FAR Bot, so several app nodes can share one database
+"""
+
+import logging
+import re
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import Config
+from far_structure import SECTION_NUMBER_RE, iter_sections, part_id_from_url
+from storage import HIGHLIGHT_END, HIGHLIGHT_START, StorageBackend, highlight_html
+
+try:
+    import psycopg2
+    import psycopg2.extras
+    import psycopg2.pool
+except ImportError:
+    psycopg2 = None
+
+logger = logging.getLogger(__name__)
+
+# Timestamps are stored at second precision in UTC, matching SQLite's CURRENT_TIMESTAMP,
+# so pagination cursors round-trip exactly
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS far_data (
+        id BIGSERIAL PRIMARY KEY,
+        fac_number TEXT NOT NULL,
+        effective_date TEXT NOT NULL,
+        scraped_at TIMESTAMP(0) NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+        file_hash TEXT,
+        is_latest BOOLEAN NOT NULL DEFAULT FALSE
+    )
+    """,
+    # The text lives in far_parts; databases created before that still have the concatenated copy
+    "ALTER TABLE far_data DROP COLUMN IF EXISTS full_text",
+    """
+    CREATE TABLE IF NOT EXISTS far_parts (
+        id BIGSERIAL PRIMARY KEY,
+        version_id BIGINT NOT NULL REFERENCES far_data(id) ON DELETE CASCADE,
+        link TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        part_id TEXT,
+        title TEXT,
+        url TEXT,
+        content TEXT NOT NULL,
+        structure JSONB,
+        error TEXT,
+        scraped_at TEXT,
+        search_vector TSVECTOR GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', content), 'B')
+        ) STORED,
+        UNIQUE (version_id, link)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS far_sections (
+        id BIGSERIAL PRIMARY KEY,
+        version_id BIGINT NOT NULL REFERENCES far_data(id) ON DELETE CASCADE,
+        section_id TEXT NOT NULL,
+        part_id TEXT,
+        subpart_id TEXT,
+        title TEXT,
+        url TEXT,
+        text TEXT NOT NULL,
+        search_vector TSVECTOR GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', section_id || ' ' || coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', text), 'B')
+        ) STORED,
+        UNIQUE (version_id, section_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS chat_history (
+        id BIGSERIAL PRIMARY KEY,
+        session_id TEXT,
+        question TEXT NOT NULL,
+        answer TEXT NOT NULL,
+        timestamp TIMESTAMP(0) NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+        user_ip TEXT,
+        response_time_ms INTEGER
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS scraping_logs (
+        id BIGSERIAL PRIMARY KEY,
+        status TEXT NOT NULL,  -- 'success', 'error', 'skipped'
+        fac_number TEXT,
+        effective_date TEXT,
+        error_message TEXT,
+        records_scraped INTEGER,
+        execution_time_seconds DOUBLE PRECISION,
+        timestamp TIMESTAMP(0) NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_far_latest ON far_data(is_latest, scraped_at)",
+    "CREATE INDEX IF NOT EXISTS idx_far_file_hash ON far_data(file_hash)",
+    "CREATE INDEX IF NOT EXISTS idx_far_parts_part ON far_parts(version_id, part_id)",
+    "CREATE INDEX IF NOT EXISTS idx_far_parts_position ON far_parts(version_id, position)",
+    "CREATE INDEX IF NOT EXISTS idx_far_parts_search ON far_parts USING GIN (search_vector)",
+    "CREATE INDEX IF NOT EXISTS idx_far_sections_search ON far_sections USING GIN (search_vector)",
+    "CREATE INDEX IF NOT EXISTS idx_chat_timestamp_id ON chat_history(timestamp, id)",
+    "CREATE INDEX IF NOT EXISTS idx_chat_session_timestamp_id ON chat_history(session_id, timestamp, id)",
+    "CREATE INDEX IF NOT EXISTS idx_scraping_timestamp_id ON scraping_logs(timestamp, id)",
+
+    # Row counts, hourly scraping outcomes and the FAR generation counter, kept current by triggers
+    """
+    CREATE TABLE IF NOT EXISTS table_counts (
+        table_name TEXT PRIMARY KEY,
+        row_count BIGINT NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS scraping_hourly (
+        hour TIMESTAMP(0) PRIMARY KEY,
+        total INTEGER NOT NULL DEFAULT 0,
+        successful INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS far_generation (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        generation BIGINT NOT NULL DEFAULT 0
+    )
+    """,
+    "INSERT INTO far_generation (id, generation) VALUES (1, 0) ON CONFLICT DO NOTHING",
+    """
+    CREATE OR REPLACE FUNCTION far_bot_count_rows() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE table_counts SET row_count = row_count + 1 WHERE table_name = TG_TABLE_NAME;
+        ELSE
+            UPDATE table_counts SET row_count = row_count - 1 WHERE table_name = TG_TABLE_NAME;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION far_bot_scraping_hourly() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO scraping_hourly (hour, total, successful)
+            VALUES (date_trunc('hour', NEW.timestamp), 1, (NEW.status = 'success')::int)
+            ON CONFLICT (hour) DO UPDATE
+            SET total = scraping_hourly.total + 1,
+                successful = scraping_hourly.successful + (NEW.status = 'success')::int;
+        ELSE
+            UPDATE scraping_hourly
+            SET total = total - 1, successful = successful - (OLD.status = 'success')::int
+            WHERE hour = date_trunc('hour', OLD.timestamp);
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION far_bot_bump_generation() RETURNS trigger AS $$
+    BEGIN
+        UPDATE far_generation SET generation = generation + 1 WHERE id = 1;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_far_data_count AFTER INSERT OR DELETE ON far_data
+    FOR EACH ROW EXECUTE FUNCTION far_bot_count_rows()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_chat_history_count AFTER INSERT OR DELETE ON chat_history
+    FOR EACH ROW EXECUTE FUNCTION far_bot_count_rows()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_scraping_logs_count AFTER INSERT OR DELETE ON scraping_logs
+    FOR EACH ROW EXECUTE FUNCTION far_bot_count_rows()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_scraping_hourly AFTER INSERT OR DELETE ON scraping_logs
+    FOR EACH ROW EXECUTE FUNCTION far_bot_scraping_hourly()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER trg_far_generation AFTER INSERT OR DELETE OR UPDATE OF is_latest ON far_data
+    FOR EACH STATEMENT EXECUTE FUNCTION far_bot_bump_generation()
+    """
+]
+
+class PostgresStorage(StorageBackend):
+    """Storage backend on PostgreSQL 14+ with a thread-safe connection pool"""
+    
+    PLACEHOLDER = "%s"
+    KEY_COMPARISON = "(timestamp, id) {op} (%s::timestamp, %s)"
+    
+    CHAT_INSERT_SQL = """
+        INSERT INTO chat_history (session_id, question, answer, user_ip, response_time_ms, timestamp)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """
+    
+    SCRAPING_LOG_INSERT_SQL = """
+        INSERT INTO scraping_logs (status, fac_number, effective_date, error_message,
+                                 records_scraped, execution_time_seconds, timestamp)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """
+    
+    COUNTED_TABLES = ("far_data", "chat_history", "scraping_logs")
+    
+    def __init__(self, dsn: str, pool_size: int = None):
+        if psycopg2 is None:
+            raise ImportError("PostgreSQL storage requires psycopg2: pip install psycopg2-binary")
+        
+        super().__init__()
+        self.pool = psycopg2.pool.ThreadedConnectionPool(1, pool_size or Config.DB_POOL_SIZE, dsn)
+        self.init_database()
+        self.start_write_behind()
+    
+    @contextmanager
+    def get_connection(self):
+        """Borrow a pooled connection whose cursors return dict rows"""
+        conn = self.pool.getconn()
+        broken = False
+        try:
+            yield conn
+        except Exception as e:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
+            logger.error(f"Database error: {e}")
+            raise
+        finally:
+            if not broken and conn.closed == 0 and conn.status != psycopg2.extensions.STATUS_READY:
+                # Never hand out a connection holding an open transaction (and its locks)
+                conn.rollback()
+            self.pool.putconn(conn, close=broken or conn.closed != 0)
+    
+    def _cursor(self, conn):
+        return conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+    
+    def init_database(self):
+        """Initialize database tables, indexes and triggers"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            for statement in SCHEMA:
+                cursor.execute(statement)
+            
+            # Seed the counters once; the triggers keep them current afterwards
+            for table in self.COUNTED_TABLES:
+                cursor.execute(f"""
+                    INSERT INTO table_counts (table_name, row_count)
+                    SELECT '{table}', COUNT(*) FROM {table}
+                    ON CONFLICT (table_name) DO NOTHING
+                """)
+            conn.commit()
+            logger.info("Database initialized successfully")
+    
+    def close(self):
+        """Drain queued writes and close all pooled connections"""
+        super().close()
+        self.pool.closeall()
+        logger.info("Database connections closed")
+    
+    def _format_row(self, row: Dict) -> Dict:
+        """Render timestamps the way the SQLite backend returns them"""
+        return {
+            key: value.strftime(TIMESTAMP_FORMAT) if hasattr(value, "strftime") else value
+            for key, value in row.items()
+        }
+    
+    def save_far_data(self, far_data: Dict) -> int:
+        """Save FAR data to database"""
+        with self.get_connection() as conn:
+            cursor = self._cursor(conn)
+            
+            # Serialize concurrent saves from several nodes
+            cursor.execute("LOCK TABLE far_data IN SHARE ROW EXCLUSIVE MODE")
+            
+            file_hash = self._calculate_hash(far_data)
+            cursor.execute("SELECT id, is_latest FROM far_data WHERE file_hash = %s LIMIT 1", (file_hash,))
+            existing = cursor.fetchone()
+            
+            if existing:
+                if not existing['is_latest']:
+                    cursor.execute("UPDATE far_data SET is_latest = FALSE WHERE is_latest")
+                    cursor.execute("UPDATE far_data SET is_latest = TRUE WHERE id = %s", (existing['id'],))
+                conn.commit()
+                self.invalidate_far_cache()
+                logger.info(f"Updated existing FAR data record {existing['id']} as latest")
+                return existing['id']
+            
+            cursor.execute("UPDATE far_data SET is_latest = FALSE WHERE is_latest")
+            cursor.execute("""
+                INSERT INTO far_data (fac_number, effective_date, file_hash, is_latest)
+                VALUES (%s, %s, %s, TRUE)
+                RETURNING id
+            """, (
+                far_data['version_info'].get('fac_number', ''),
+                far_data['version_info'].get('effective_date', ''),
+                file_hash
+            ))
+            record_id = cursor.fetchone()['id']
+            
+            for position, (link, part_data) in enumerate(far_data['parts'].items()):
+                structure = part_data.get('structure')
+                cursor.execute("""
+                    INSERT INTO far_parts (version_id, link, position, part_id, title, url, content,
+                                           structure, error, scraped_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """, (
+                    record_id,
+                    link,
+                    position,
+                    structure['id'] if structure else part_id_from_url(link),
+                    part_data.get('title'),
+                    part_data.get('url'),
+                    part_data.get('content', ''),
+                    psycopg2.extras.Json(structure) if structure else None,
+                    part_data.get('error'),
+                    part_data.get('scraped_at')
+                ))
+                psycopg2.extras.execute_batch(cursor, """
+                    INSERT INTO far_sections (version_id, section_id, part_id, subpart_id, title, url, text)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (version_id, section_id) DO UPDATE
+                    SET part_id = EXCLUDED.part_id, subpart_id = EXCLUDED.subpart_id,
+                        title = EXCLUDED.title, url = EXCLUDED.url, text = EXCLUDED.text
+                """, [
+                    (record_id, section['id'], section['part'], section['subpart'],
+                     section['title'], section['url'], section['text'])
+                    for section in iter_sections(part_data)
+                ])
+            
+            conn.commit()
+            self.invalidate_far_cache()
+            logger.info(f"Saved new FAR data with ID {record_id}")
+            return record_id
+    
+    def _read_far_generation(self) -> int:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT generation FROM far_generation WHERE id = 1")
+            generation = cursor.fetchone()[0]
+            conn.commit()
+            return generation
+    
+    def _query_latest_far_version(self) -> Optional[Dict]:
+        with self.get_connection() as conn:
+            cursor = self._cursor(conn)
+            cursor.execute("""
+                SELECT id, fac_number, effective_date, scraped_at FROM far_data
+                WHERE is_latest
+                ORDER BY scraped_at DESC
+                LIMIT 1
+            """)
+            row = cursor.fetchone()
+            conn.commit()
+            return self._format_row(row) if row else None
+    
+    def get_far_part(self, part: str, version_id: Optional[int] = None) -> Optional[Dict]:
+        """Get one part of a FAR version (default: latest) by part number or link"""
+        version_id = self._resolve_version(version_id)
+        if version_id is None:
+            return None
+        
+        with self.get_connection() as conn:
+            cursor = self._cursor(conn)
+            cursor.execute("""
+                SELECT id, version_id, link, position, part_id, title, url, content, structure, error, scraped_at
+                FROM far_parts
+                WHERE version_id = %s AND (part_id = %s OR link = %s)
+                ORDER BY position
+                LIMIT 1
+            """, (version_id, part, part))
+            row = cursor.fetchone()
+            conn.commit()
+            return dict(row) if row else None
+    
+    def iter_far_parts(self, version_id: Optional[int] = None) -> Iterator[Dict]:
+        """Stream the parts of a FAR version (default: latest) in scrape order"""
+        version_id = self._resolve_version(version_id)
+        if version_id is None:
+            return
+        
+        with self.get_connection() as conn:
+            # Named (server-side) cursor, so rows arrive in batches instead of all at once
+            cursor = conn.cursor(name="iter_far_parts", cursor_factory=psycopg2.extras.RealDictCursor)
+            cursor.itersize = 20
+            cursor.execute("""
+                SELECT id, version_id, link, position, part_id, title, url, content, structure, error, scraped_at
+                FROM far_parts WHERE version_id = %s ORDER BY position
+            """, (version_id,))
+            for row in cursor:
+                yield dict(row)
+            cursor.close()
+            conn.commit()
+    
+    def get_far_section(self, section_id: str, version_id: Optional[int] = None) -> Optional[Dict]:
+        """Get one section of a FAR version (default: latest) by section number, e.g. 52.212-4"""
+        version_id = self._resolve_version(version_id)
+        if version_id is None:
+            return None
+        
+        with self.get_connection() as conn:
+            cursor = self._cursor(conn)
+            cursor.execute("""
+                SELECT id, version_id, section_id, part_id, subpart_id, title, url, text
+                FROM far_sections WHERE version_id = %s AND section_id = %s
+            """, (version_id, section_id))
+            row = cursor.fetchone()
+            conn.commit()
+            return dict(row) if row else None
+    
+    def _tsquery(self, query: str, match_all: bool) -> Tuple[str, List[str]]:
+        """SQL tsquery expression and its parameters: section numbers as phrases, other words as terms"""
+        numbers = SECTION_NUMBER_RE.findall(query)
+        words = re.findall(r"\w+", SECTION_NUMBER_RE.sub(" ", query))
+        parts = ["phraseto_tsquery('english', %s)"] * len(numbers) + ["plainto_tsquery('english', %s)"] * len(words)
+        return (" && " if match_all else " || ").join(parts), numbers + words
+    
+    def search_far(self, query: str, limit: int = 10, version_id: Optional[int] = None,
+                   match_all: bool = True) -> List[Dict]:
+        """Full-text search over FAR sections (and parts without sections), best match first"""
+        tsquery, params = self._tsquery(query, match_all)
+        version_id = self._resolve_version(version_id)
+        if not params or version_id is None:
+            return []
+        
+        # Matches are marked with control characters and turned into <mark> tags after escaping
+        markers = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}"
+        with self.get_connection() as conn:
+            cursor = self._cursor(conn)
+            cursor.execute(f"""
+                WITH q AS (SELECT {tsquery} AS query),
+                matches AS (
+                    SELECT 'section' AS kind, section_id AS ref_id, part_id, url,
+                           section_id || ' ' || coalesce(title, '') AS title, text, search_vector
+                    FROM far_sections, q
+                    WHERE version_id = %s AND search_vector @@ q.query
+                    UNION ALL
+                    SELECT 'part', link, part_id, url, coalesce(title, ''), content, search_vector
+                    FROM far_parts p, q
+                    WHERE version_id = %s AND error IS NULL AND search_vector @@ q.query
+                    AND NOT EXISTS (
+                        SELECT 1 FROM far_sections s WHERE s.version_id = p.version_id AND s.part_id = p.part_id
+                    )
+                ),
+                ranked AS (
+                    SELECT matches.*, ts_rank_cd(search_vector, q.query) AS rank
+                    FROM matches, q
+                    ORDER BY rank DESC
+                    LIMIT %s
+                )
+                SELECT kind, ref_id, part_id, url,
+                       ts_headline('english', title, q.query, %s) AS title,
+                       ts_headline('english', text, q.query, %s) AS snippet,
+                       -rank AS score
+                FROM ranked, q
+                ORDER BY rank DESC
+            """, params + [version_id, version_id, limit,
+                           f"{markers}, HighlightAll=true",
+                           f"{markers}, MaxWords=32, MinWords=12, FragmentDelimiter=…"])
+            rows = cursor.fetchall()
+            conn.commit()
+            return [dict(row, title=highlight_html(row['title']), snippet=highlight_html(row['snippet'])) for row in rows]
+    
+    def _execute_insert(self, sql: str, params: Tuple) -> Optional[int]:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql.rstrip() + " RETURNING id", params)
+            record_id = cursor.fetchone()[0]
+            conn.commit()
+            return record_id
+    
+    def clear_chat_history(self, session_id: str = None) -> int:
+        """Clear chat history"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if session_id:
+                cursor.execute("DELETE FROM chat_history WHERE session_id = %s", (session_id,))
+            else:
+                cursor.execute("DELETE FROM chat_history")
+            deleted_count = cursor.rowcount
+            conn.commit()
+            return deleted_count
+    
+    def _iter_rows(self, sql: str, params: Tuple) -> Iterator[Dict]:
+        with self.get_connection() as conn:
+            # A server-side cursor, so large results arrive in batches
+            db_cursor = conn.cursor(name="stream_rows", cursor_factory=psycopg2.extras.RealDictCursor)
+            db_cursor.itersize = 200
+            db_cursor.execute(sql, params)
+            for row in db_cursor:
+                yield self._format_row(row)
+            db_cursor.close()
+            conn.commit()
+    
+    def _compute_stats(self) -> Dict:
+        """Database statistics from the trigger-maintained rollups"""
+        with self.get_connection() as conn:
+            cursor = self._cursor(conn)
+            
+            cursor.execute("SELECT table_name, row_count FROM table_counts")
+            counts = {row['table_name']: row['row_count'] for row in cursor.fetchall()}
+            
+            cursor.execute("""
+                SELECT fac_number, effective_date, scraped_at
+                FROM far_data
+                WHERE is_latest
+                LIMIT 1
+            """)
+            latest_far = cursor.fetchone()
+            
+            cursor.execute("""
+                SELECT COALESCE(SUM(total), 0) AS total, COALESCE(SUM(successful), 0) AS successful
+                FROM scraping_hourly
+                WHERE hour >= date_trunc('hour', (now() AT TIME ZONE 'utc') - interval '7 days')
+            """)
+            recent_stats = cursor.fetchone()
+            conn.commit()
+            
+            return {
+                'far_data_records': counts.get('far_data', 0),
+                'chat_messages': counts.get('chat_history', 0),
+                'scraping_logs': counts.get('scraping_logs', 0),
+                'latest_far': self._format_row(latest_far) if latest_far else None,
+                'recent_scraping_success_rate': (
+                    float(recent_stats['successful']) / float(recent_stats['total']) * 100
+                    if recent_stats['total'] > 0 else 0
+                )
+            }
+    
+    def _delete_in_batches(self, table: str, where: str, params: Tuple) -> int:
+        """Delete matching rows a batch at a time, committing and pausing between batches"""
+        deleted = 0
+        while True:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"""
+                    DELETE FROM {table} WHERE id IN (
+                        SELECT id FROM {table} WHERE {where} LIMIT %s
+                    )
+                """, params + (Config.DB_CLEANUP_BATCH_SIZE,))
+                batch_deleted = cursor.rowcount
+                conn.commit()
+            
+            deleted += batch_deleted
+            if batch_deleted < Config.DB_CLEANUP_BATCH_SIZE:
+                return deleted
+            time.sleep(Config.DB_CLEANUP_PAUSE)
+    
+    def cleanup_old_data(self, days_to_keep: int = 30) -> Dict:
+        """Clean up old data in small batches; parts and sections go with their version by cascade"""
+        cutoff = (int(days_to_keep),)
+        older_than = "(now() AT TIME ZONE 'utc') - make_interval(days => %s)"
+        
+        far_deleted = self._delete_in_batches("far_data", f"NOT is_latest AND scraped_at < {older_than}", cutoff)
+        chat_deleted = self._delete_in_batches("chat_history", f"timestamp < {older_than}", cutoff)
+        logs_deleted = self._delete_in_batches("scraping_logs", f"timestamp < {older_than}", cutoff)
+        with self.get_connection() as conn:
+            conn.cursor().execute("DELETE FROM scraping_hourly WHERE total <= 0")
+            conn.commit()
+        
+        logger.info(f"Cleaned up {far_deleted} old FAR records, {chat_deleted} chat messages, {logs_deleted} scraping logs")
+        
+        return {
+            'far_deleted': far_deleted,
+            'chat_deleted': chat_deleted,
+            'logs_deleted': logs_deleted
+        }
@@ -0,0 +1,173 @@
+"""
+Hybrid FAR retrieval: full-text and vector search run in parallel and are fused by reciprocal rank
+"""
+
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+from database import db_manager
+from far_index import vector_index
+from far_structure import SECTION_NUMBER_RE
+
+logger = logging.getLogger(__name__)
+
+# Words too common in questions to say anything about relevance
+STOPWORDS = frozenset("""
+    about and are can does for from has have how into its not that the their there this what when where which
+    who why will with would should shall under
+""".split())
+
+def rrf_scores(rankings: List[List[Tuple]], k: int) -> Dict[Tuple, float]:
+    """Reciprocal rank fusion: every ranking adds 1 / (k + rank) to each key it contains"""
+    scores = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, 1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return scores
+
+def query_terms(text: str) -> set:
+    return {word for word in re.findall(r"[a-z0-9]+", text.lower()) if len(word) > 2 and word not in STOPWORDS}
+
+class SearchStage:
+    """One retrieval stage with its own worker pool.
+
+    A search that misses its deadline cannot be interrupted and keeps its worker until it
+    finishes, so new searches are only submitted while a worker is free; queued behind
+    slow ones they would miss their budget anyway.
+    """
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"retriever-{name.lower()}")
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args):
+        """Run fn(*args) on a free worker; None (and a warning) when every worker is busy"""
+        with self._lock:
+            if self.in_flight >= self.workers:
+                logger.warning(f"{self.name} search skipped: all {self.workers} workers busy with earlier searches")
+                return None
+            self.in_flight += 1
+        try:
+            future = self.executor.submit(fn, *args)
+        except Exception:
+            self._done(None)
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        with self._lock:
+            self.in_flight -= 1
+
+    def collect(self, future, deadline: float) -> List[Dict]:
+        """The stage's results, or none if it was skipped, failed or missed its deadline"""
+        if future is None:
+            return []
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeout:
+            with self._lock:
+                in_flight = self.in_flight
+            logger.warning(f"{self.name} search exceeded its latency budget ({in_flight}/{self.workers} workers busy)")
+        except Exception as e:
+            logger.error(f"{self.name} search failed: {e}")
+        return []
+
+class HybridRetriever:
+    """Top-k FAR chunks for a question from BM25 full-text search and the vector index.
+
+    Each stage gets RETRIEVAL_CANDIDATES results and a latency budget; a stage that fails,
+    runs over budget or has no free worker is left out of the fusion instead of delaying
+    the answer.
+    """
+
+    def __init__(self, workers_per_stage: int = 4):
+        # Long-lived pools, so a question does not pay for starting threads, and a slow
+        # vector search never holds up full-text search
+        self.lexical = SearchStage("Full-text", workers_per_stage)
+        self.vector = SearchStage("Vector", workers_per_stage)
+
+    def retrieve(self, question: str, k: int = None, use_vector: bool = True) -> List[Dict]:
+        """The k best chunks for a question, with their text"""
+        k = k or Config.RETRIEVAL_TOP_K
+        candidates_per_stage = max(k, Config.RETRIEVAL_CANDIDATES)
+        started = time.monotonic()
+
+        lexical = self.lexical.submit(db_manager.search_far, question, candidates_per_stage, None, False)
+        vector = None
+        if use_vector and vector_index.available:
+            vector = self.vector.submit(vector_index.search_chunks, question, candidates_per_stage)
+
+        lexical_hits = self.lexical.collect(lexical, started + Config.RETRIEVAL_LEXICAL_BUDGET_MS / 1000)
+        vector_hits = self.vector.collect(vector, started + Config.RETRIEVAL_VECTOR_BUDGET_MS / 1000)
+        logger.debug(f"Retrieval: {len(lexical_hits)} full-text and {len(vector_hits)} vector hits "
+                     f"in {(time.monotonic() - started) * 1000:.0f} ms")
+
+        # Fuse per section (or part); a long section keeps its best-ranked vector chunk
+        lexical_keys = [(hit['kind'], hit['ref_id']) for hit in lexical_hits]
+        best_chunks = {}
+        for chunk in vector_hits:
+            best_chunks.setdefault((chunk['kind'], chunk['ref']), chunk)
+        scores = rrf_scores([lexical_keys, list(best_chunks)], Config.RRF_K)
+        ranked = sorted(scores, key=scores.get, reverse=True)
+
+        # Load text only for the chunks that can still make the cut
+        depth = k * 2 if Config.RETRIEVAL_RERANK else k
+        results = []
+        for key in ranked[:depth]:
+            chunk = self._load(key, best_chunks.get(key))
+            if chunk:
+                chunk['score'] = scores[key]
+                results.append(chunk)
+
+        if Config.RETRIEVAL_RERANK:
+            results = self.rerank(question, results)
+        return results[:k]
+
+    def _load(self, key: Tuple[str, str], chunk: Optional[Dict]) -> Optional[Dict]:
+        """A candidate with its text: the vector chunk's range, or the start of a full-text hit"""
+        kind, ref = key
+        version_id = chunk['version_id'] if chunk else None
+        if kind == 'section':
+            row = db_manager.get_far_section(ref, version_id)
+            text = row['text'] if row else None
+        else:
+            row = db_manager.get_far_part(ref, version_id)
+            text = row['content'] if row else None
+        if text is None:
+            return None
+
+        start, end = (chunk['start'], chunk['end']) if chunk else (0, min(len(text), Config.VECTOR_CHUNK_CHARS))
+        return {
+            'kind': kind,
+            'ref': ref,
+            'part_id': row['part_id'],
+            'title': row['title'] or '',
+            'url': row['url'],
+            'start': start,
+            'end': end,
+            'text': text[start:end]
+        }
+
+    def rerank(self, question: str, candidates: List[Dict]) -> List[Dict]:
+        """Cheap second pass: put sections the question cites first, then favour chunks covering more of its terms"""
+        cited = set(SECTION_NUMBER_RE.findall(question))
+        terms = query_terms(question)
+        for candidate in candidates:
+            coverage = len(terms & query_terms(f"{candidate['title']} {candidate['text']}")) / len(terms) if terms else 0.0
+            # Full coverage is worth as much as a first place in one more ranking
+            candidate['score'] += coverage / (Config.RRF_K + 1)
+            if candidate['kind'] == 'section' and candidate['ref'] in cited:
+                candidate['score'] += 1.0
+        return sorted(candidates, key=lambda candidate: candidate['score'], reverse=True)
+
+# Global retriever instance
+hybrid_retriever = HybridRetriever()
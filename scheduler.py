@@ -14,6 +14,7 @@ import atexit
 
 from scrape_far import FARScraper
 from database import db_manager
+from far_index import save_and_index
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -53,14 +54,27 @@ class FARScheduler:
         
         try:
             # Run scraping
-            result_file = self.scraper.run_scrape()
+            latest_version = db_manager.get_latest_far_version()
+            result_file = self.scraper.run_scrape(latest_version)
             
-            # Load and save to database
-            with open(result_file.replace('.txt', '.json'), 'r', encoding='utf-8') as f:
-                import json
-                far_data = json.load(f)
+            # Unchanged FAR already in the database: log it without loading the saved scrape
+            version_info = self.scraper.last_version_info
+            if (self.scraper.last_run_skipped and latest_version and
+                latest_version['fac_number'] == version_info.get('fac_number') and
+                latest_version['effective_date'] == version_info.get('effective_date')):
+                db_manager.log_scraping_result(
+                    status='skipped',
+                    fac_number=version_info.get('fac_number'),
+                    effective_date=version_info.get('effective_date'),
+                    execution_time_seconds=time.time() - start_time
+                )
+                logger.info("FAR version unchanged. Scheduled scraping skipped.")
+                return
             
-            record_id = db_manager.save_far_data(far_data)
+            # Load, save to database and index for retrieval
+            far_data = self.scraper.load_far_data(result_file)
+            
+            record_id = save_and_index(far_data)
             execution_time = time.time() - start_time
             
             # Log success
@@ -96,6 +110,13 @@ class FARScheduler:
         except Exception as e:
             logger.error(f"Scheduled cleanup failed: {e}")
     
+    def vacuum_job(self):
+        """Incremental vacuum job"""
+        try:
+            db_manager.incremental_vacuum()
+        except Exception as e:
+            logger.error(f"Incremental vacuum failed: {e}")
+    
     def start_scheduler(self):
         """Start the scheduler with jobs"""
         if self.scheduler.running:
@@ -120,6 +141,15 @@ class FARScheduler:
             replace_existing=True
         )
         
+        # Add hourly incremental vacuum to return pages freed by cleanup
+        self.scheduler.add_job(
+            func=self.vacuum_job,
+            trigger=CronTrigger(minute=30),
+            id='incremental_vacuum',
+            name='Incremental Database Vacuum',
+            replace_existing=True
+        )
+        
         # Start scheduler
         self.scheduler.start()
         logger.info("Scheduler started successfully")
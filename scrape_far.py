@@ -1,33 +1,338 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 import os
 import json
 import hashlib
 from datetime import datetime
-import re
-from typing import Dict, List, Optional, Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from config import Config
+from far_diff import diff_versions, part_hash, read_delta, summarize_changes, write_delta
+from far_parser import ParsedPart, get_parser
+from far_store import VersionStore
+from far_structure import extract_structure, part_id_from_url
 
 BASE_URL = "https://www.acquisition.gov"
 INDEX_URL = f"{BASE_URL}/browse/index/far"
 
+def same_version(version_info: Dict, other: Dict) -> bool:
+    """Whether two version records describe the same FAC number and effective date"""
+    return (version_info.get("fac_number") == other.get("fac_number") and
+            version_info.get("effective_date") == other.get("effective_date"))
+
+class RateLimiter:
+    """Token bucket limiting request starts per second, plus a cap on requests in flight"""
+    
+    def __init__(self, rate: float, burst: int = 1, max_in_flight: int = 4):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+        self.in_flight = threading.BoundedSemaphore(max(1, max_in_flight))
+    
+    def acquire(self):
+        """Block until a request slot and a rate token are both available"""
+        self.in_flight.acquire()
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+    
+    def release(self):
+        self.in_flight.release()
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+class PartCache:
+    """On-disk per-URL cache of HTTP validators and parsed FAR part payloads
+    
+    Entries are keyed by the parser backend as well as the URL, so switching FAR_PARSER
+    never serves parses made by another backend.
+    """
+    
+    def __init__(self, cache_dir: str, parser: str):
+        self.cache_dir = cache_dir
+        self.parser = parser
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def path_for(self, url: str) -> str:
+        key = f"{self.parser}:{url}"
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+    
+    def get(self, url: str) -> Optional[Dict]:
+        """Get the cache entry for url, or None if missing or unreadable"""
+        path = self.path_for(url)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable cache entry for {url}: {e}")
+            return None
+    
+    def put(self, url: str, entry: Dict):
+        """Store the cache entry for url, replacing any previous one atomically"""
+        path = self.path_for(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(dict(entry, url=url), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+class ScrapeJournal:
+    """Append-only checkpoint of completed FAR parts so an interrupted scrape can resume"""
+    
+    def __init__(self, data_dir: str):
+        self.journal_file = os.path.join(data_dir, "scrape_journal.jsonl")
+        self.failed_file = os.path.join(data_dir, "scrape_failed.jsonl")
+        self.lock = threading.Lock()
+    
+    def start(self, version_info: Dict, links: List[str], resume: bool = True) -> Set[str]:
+        """Return links already completed for this FAR version, starting a fresh journal otherwise.
+        
+        links is the index order of the parts, which iter_parts restores.
+        """
+        completed = set()
+        if resume:
+            completed = self.completed_links(version_info)
+        
+        with self.lock:
+            if not completed:
+                with open(self.journal_file, "w", encoding="utf-8") as f:
+                    header = {"type": "header", "version_info": version_info, "links": links}
+                    f.write(json.dumps(header, ensure_ascii=False) + "\n")
+            else:
+                # Terminate any torn final line so new entries start on a line of their own
+                with open(self.journal_file, "rb+") as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+            # Every part not yet completed is attempted again, so earlier failures are moot
+            open(self.failed_file, "w", encoding="utf-8").close()
+        
+        return completed
+    
+    def completed_links(self, version_info: Dict) -> Set[str]:
+        """Get links of completed parts if the journal belongs to the same FAR version"""
+        if not os.path.exists(self.journal_file):
+            return set()
+        
+        try:
+            with open(self.journal_file, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline() or "{}")
+            if not same_version(header.get("version_info", {}), version_info):
+                return set()
+            return {link for link, _ in self.iter_entries(self.journal_file, skip_header=True)}
+        except Exception as e:
+            print(f"Error reading scrape journal: {e}")
+            return set()
+    
+    def read_header(self) -> Dict:
+        if not os.path.exists(self.journal_file):
+            return {}
+        with open(self.journal_file, "r", encoding="utf-8") as f:
+            try:
+                return json.loads(f.readline() or "{}")
+            except ValueError:
+                return {}
+    
+    def iter_parts(self) -> Iterator[Tuple[str, Dict]]:
+        """Stream (link, part_data) in index order: each completed part, or the placeholder of a failed one.
+        
+        Parts are journaled in completion order, so only the byte offset of each entry is
+        kept in memory and the parts are read back one at a time in the order of the index.
+        """
+        offsets = {}
+        # Failures first, so a part completed on retry wins over its earlier failure
+        for path in (self.failed_file, self.journal_file):
+            for link, offset in self.iter_offsets(path):
+                offsets[link] = (path, offset)
+        
+        order = [link for link in self.read_header().get("links", []) if link in offsets]
+        listed = set(order)
+        order += [link for link in offsets if link not in listed]
+        
+        files = {}
+        try:
+            for link in order:
+                path, offset = offsets[link]
+                if path not in files:
+                    files[path] = open(path, "rb")
+                files[path].seek(offset)
+                yield link, json.loads(files[path].readline())["part"]
+        finally:
+            for f in files.values():
+                f.close()
+    
+    def iter_offsets(self, path: str) -> Iterator[Tuple[str, int]]:
+        """(link, byte offset) of every complete part entry in a journal file"""
+        if not os.path.exists(path):
+            return
+        
+        with open(path, "rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    entry = {}
+                if "link" in entry:
+                    yield entry["link"], offset
+                offset += len(line)
+    
+    def iter_entries(self, path: str, skip_header: bool = False) -> Iterator[Tuple[str, Dict]]:
+        if not os.path.exists(path):
+            return
+        
+        with open(path, "r", encoding="utf-8") as f:
+            if skip_header:
+                f.readline()
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-write; that part is simply re-scraped
+                    continue
+                yield entry["link"], entry["part"]
+    
+    def record_part(self, link: str, part_data: Dict):
+        """Append a completed part to the journal"""
+        self._append(self.journal_file, {"type": "part", "link": link, "part": part_data})
+    
+    def record_failure(self, link: str, part_data: Dict):
+        """Record a failed part so it can be retried on its own"""
+        self._append(self.failed_file, {"link": link, "part": part_data, "failed_at": datetime.now().isoformat()})
+    
+    def failed_links(self) -> List[str]:
+        """Get links of parts that failed in the current journal"""
+        links = []
+        for link, _ in self.iter_entries(self.failed_file):
+            if link not in links:
+                links.append(link)
+        return links
+    
+    def reset_failures(self):
+        with self.lock:
+            open(self.failed_file, "w", encoding="utf-8").close()
+    
+    def clear(self):
+        """Remove the journal and its failures once the scrape has been saved"""
+        with self.lock:
+            for path in (self.journal_file, self.failed_file):
+                if os.path.exists(path):
+                    os.remove(path)
+    
+    def _append(self, path: str, entry: Dict):
+        with self.lock:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
 class FARScraper:
-    def __init__(self, data_dir: str = "data"):
-        self.data_dir = data_dir
-        self.version_file = os.path.join(data_dir, "far_versions.json")
+    def __init__(self, data_dir: Optional[str] = None, use_cache: Optional[bool] = None):
+        self.data_dir = data_dir or Config.DATA_DIR
+        self.version_file = os.path.join(self.data_dir, "far_versions.json")
+        self.manifest_file = os.path.join(self.data_dir, "far_manifest.json")
+        self.version_store = VersionStore(self.data_dir)
+        self.last_run_skipped = False
+        self.last_version_info: Dict = {}
+        self.rate_limiters: Dict[str, RateLimiter] = {}
+        self.rate_limiters_lock = threading.Lock()
+        self.session = self.create_session()
+        self.index_cache: Optional[Tuple[Dict, List[str]]] = None
         self.ensure_data_dir()
         
+        if use_cache is None:
+            use_cache = Config.SCRAPE_HTTP_CACHE
+        self.parser = get_parser(Config.FAR_PARSER)
+        self.part_cache = PartCache(os.path.join(self.data_dir, "http_cache"), self.parser.name) if use_cache else None
+        self.journal = ScrapeJournal(self.data_dir)
+        
     def ensure_data_dir(self):
         """Create data directory if it doesn't exist"""
         os.makedirs(self.data_dir, exist_ok=True)
-        
+    
+    def get_rate_limiter(self, url: str) -> RateLimiter:
+        """Get the shared rate limiter for the host serving url"""
+        host = urlparse(url).netloc
+        with self.rate_limiters_lock:
+            if host not in self.rate_limiters:
+                self.rate_limiters[host] = RateLimiter(
+                    Config.SCRAPE_RATE_LIMIT,
+                    burst=Config.SCRAPE_BURST,
+                    max_in_flight=Config.SCRAPE_MAX_IN_FLIGHT
+                )
+            return self.rate_limiters[host]
+        
+    def create_session(self) -> requests.Session:
+        """Create a keep-alive HTTP session with connection pooling and retry/backoff"""
+        session = requests.Session()
+        retry = Retry(
+            total=Config.SCRAPE_RETRIES,
+            backoff_factor=Config.SCRAPE_BACKOFF_FACTOR,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(
+            max_retries=retry,
+            pool_connections=1,
+            pool_maxsize=max(1, Config.SCRAPE_MAX_IN_FLIGHT)
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    
+    def close(self):
+        """Close pooled HTTP connections"""
+        self.session.close()
+    
+    def fetch_index(self, refresh: bool = False) -> Tuple[Dict, List[str]]:
+        """Download and parse the FAR index page once, returning (version_info, far_links)"""
+        if self.index_cache is None or refresh:
+            print("Fetching FAR index...")
+            with self.get_rate_limiter(INDEX_URL):
+                res = self.session.get(INDEX_URL, timeout=30)
+            res.raise_for_status()
+            soup = BeautifulSoup(res.text, "html.parser")
+            self.index_cache = (self.parse_version_info(soup), self.parse_far_links(soup))
+        
+        version_info, far_links = self.index_cache
+        return dict(version_info), list(far_links)
+    
     def get_current_version_info(self) -> Dict:
         """Get current FAR version information from the main page"""
-        print("Fetching current FAR version info...")
-        res = requests.get(INDEX_URL)
-        res.raise_for_status()
-        soup = BeautifulSoup(res.text, "html.parser")
-        
-        # Look for the FAC Number and Effective Date in the table
+        version_info, _ = self.fetch_index()
+        return version_info
+    
+    def get_far_links(self) -> List[str]:
+        """Get all FAR part links from the index page"""
+        _, far_links = self.fetch_index()
+        return far_links
+    
+    def parse_version_info(self, soup: BeautifulSoup) -> Dict:
+        """Extract the FAC Number and Effective Date from the parsed index page"""
         version_info = {}
         
         # Find the table with version information
@@ -49,14 +354,8 @@ class FARScraper:
         
         return version_info
     
-    def get_far_links(self) -> List[str]:
-        """Get all FAR part links from the index page"""
-        print("Fetching FAR index...")
-        res = requests.get(INDEX_URL)
-        res.raise_for_status()
-        soup = BeautifulSoup(res.text, "html.parser")
-        
-        # Find all links that point to FAR parts
+    def parse_far_links(self, soup: BeautifulSoup) -> List[str]:
+        """Extract all FAR part links from the parsed index page"""
         far_links = []
         
         # Look for links in the table that contain FAR parts
@@ -73,53 +372,66 @@ class FARScraper:
                 if "/far/part-" in href:
                     far_links.append(href)
         
-        # Remove duplicates and return
-        return list(set(far_links))
+        # Remove duplicates, keeping the index order
+        return list(dict.fromkeys(far_links))
     
-    def scrape_far_part(self, part_url: str) -> Dict:
-        """Scrape a single FAR part"""
+    def scrape_far_part(self, part_url: str, structured: Optional[bool] = None) -> Dict:
+        """Scrape a single FAR part, revalidating against the HTTP cache when possible.
+        
+        With structured=True the part also carries a "structure" hierarchy of
+        subparts, sections and paragraph offsets into its content.
+        """
+        if structured is None:
+            structured = Config.SCRAPE_STRUCTURED
         full_url = BASE_URL + part_url if part_url.startswith("/") else part_url
         print(f"Fetching {full_url}")
         
         try:
-            page = requests.get(full_url, timeout=30)
-            page.raise_for_status()
-            soup = BeautifulSoup(page.text, "html.parser")
+            cached = self.part_cache.get(full_url) if self.part_cache else None
+            if cached and structured and "structure" not in cached["part"]:
+                # Cached before structured extraction was enabled; fetch and parse again
+                cached = None
+            headers = {}
+            if cached:
+                if cached.get("etag"):
+                    headers["If-None-Match"] = cached["etag"]
+                if cached.get("last_modified"):
+                    headers["If-Modified-Since"] = cached["last_modified"]
             
-            # Extract title
-            title = soup.find("h1") or soup.find("title")
-            title_text = title.get_text(strip=True) if title else part_url
+            with self.get_rate_limiter(full_url):
+                page = self.session.get(full_url, headers=headers, timeout=30)
             
-            # Extract main content - try different selectors
-            content_selectors = [
-                "div.field-item",
-                "article",
-                "div.content",
-                "main",
-                "div.main-content"
-            ]
+            if page.status_code == 304 and cached:
+                print(f"Not modified, using cached parse: {full_url}")
+                return self.cached_part(cached, structured)
             
-            content = ""
-            for selector in content_selectors:
-                content_div = soup.select_one(selector)
-                if content_div:
-                    content = content_div.get_text(separator="\n", strip=True)
-                    break
-            
-            # If no specific content found, get all text
-            if not content:
-                content = soup.get_text(separator="\n", strip=True)
+            page.raise_for_status()
             
-            # Clean up content
-            content = re.sub(r'\n\s*\n', '\n\n', content)  # Remove excessive newlines
-            content = re.sub(r'\s+', ' ', content)  # Normalize whitespace
+            # Fall back to a content hash when the server sends no usable validators
+            content_hash = hashlib.sha256(page.content).hexdigest()
+            if cached and cached.get("content_hash") == content_hash:
+                print(f"Content unchanged, using cached parse: {full_url}")
+                return self.cached_part(cached, structured)
             
-            return {
+            parsed = self.parse_far_part(page.text, part_url)
+            part_data = {
                 "url": full_url,
-                "title": title_text,
-                "content": content,
+                "title": parsed.title,
+                "content": parsed.content,
                 "scraped_at": datetime.now().isoformat()
             }
+            if structured:
+                part_data["structure"] = extract_structure(part_id_from_url(full_url), parsed.title, parsed.blocks)
+            
+            if self.part_cache:
+                self.part_cache.put(full_url, {
+                    "etag": page.headers.get("ETag"),
+                    "last_modified": page.headers.get("Last-Modified"),
+                    "content_hash": content_hash,
+                    "part": part_data
+                })
+            
+            return part_data
             
         except Exception as e:
             print(f"Error scraping {full_url}: {e}")
@@ -127,99 +439,311 @@ class FARScraper:
                 "url": full_url,
                 "title": f"Error: {part_url}",
                 "content": f"Error scraping this part: {e}",
-                "scraped_at": datetime.now().isoformat()
+                "scraped_at": datetime.now().isoformat(),
+                "error": str(e)
             }
     
-    def scrape_all_far(self) -> Dict:
-        """Scrape all FAR parts"""
-        version_info = self.get_current_version_info()
-        far_links = self.get_far_links()
+    def parse_far_part(self, html: str, part_url: str) -> ParsedPart:
+        """Parse a FAR part page into its title and block-level text using the configured parser backend"""
+        return self.parser.parse(html, part_url)
+    
+    def cached_part(self, cached: Dict, structured: bool) -> Dict:
+        part_data = dict(cached["part"], scraped_at=datetime.now().isoformat())
+        if not structured:
+            part_data.pop("structure", None)
+        return part_data
+    
+    def scrape_to_journal(self, concurrent: Optional[bool] = None, resume: bool = True) -> Dict:
+        """Scrape all FAR parts into the checkpoint journal and return the version info"""
+        if concurrent is None:
+            concurrent = Config.SCRAPE_CONCURRENT
+        
+        version_info, far_links = self.fetch_index()
+        completed = self.journal.start(version_info, far_links, resume=resume)
         
         print(f"Found {len(far_links)} FAR parts to scrape")
+        if completed:
+            print(f"Resuming scrape: {len(completed)} parts already completed")
         
-        all_parts = {}
-        for i, link in enumerate(far_links, 1):
-            print(f"Scraping part {i}/{len(far_links)}: {link}")
+        self.scrape_links([link for link in far_links if link not in completed], concurrent=concurrent)
+        self.retry_failed_parts(concurrent=concurrent)
+        
+        return version_info
+    
+    def scrape_links(self, links: List[str], concurrent: bool = True) -> List[str]:
+        """Scrape the given part links into the journal, returning the links that failed"""
+        def scrape_link(indexed_link: Tuple[int, str]) -> Optional[str]:
+            i, link = indexed_link
+            print(f"Scraping part {i}/{len(links)}: {link}")
             part_data = self.scrape_far_part(link)
-            all_parts[link] = part_data
             
-            # Add small delay to be respectful to the server
-            import time
-            time.sleep(1)
-        
-        # Combine all content
-        full_text = f"# Federal Acquisition Regulation (FAR)\n"
-        full_text += f"Version: {version_info.get('fac_number', 'Unknown')}\n"
-        full_text += f"Effective Date: {version_info.get('effective_date', 'Unknown')}\n"
-        full_text += f"Scraped: {version_info.get('scraped_at', 'Unknown')}\n\n"
+            # Parts go straight to disk so at most one per worker is held in memory
+            if "error" in part_data:
+                self.journal.record_failure(link, part_data)
+                return link
+            self.journal.record_part(link, part_data)
+            return None
         
-        for part_url, part_data in all_parts.items():
-            full_text += f"\n\n## {part_data['title']}\n"
-            full_text += f"URL: {part_data['url']}\n\n"
-            full_text += part_data['content']
+        # Request pacing is handled by the per-host rate limiter in scrape_far_part
+        indexed_links = list(enumerate(links, 1))
+        if concurrent:
+            with ThreadPoolExecutor(max_workers=max(1, Config.SCRAPE_MAX_IN_FLIGHT)) as executor:
+                results = list(executor.map(scrape_link, indexed_links))
+        else:
+            results = [scrape_link(indexed_link) for indexed_link in indexed_links]
         
-        return {
-            "version_info": version_info,
-            "parts": all_parts,
-            "full_text": full_text,
-            "scraped_at": datetime.now().isoformat()
-        }
+        return [link for link in results if link]
     
-    def save_far_data(self, far_data: Dict) -> str:
-        """Save FAR data to files"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Save full text
-        text_file = os.path.join(self.data_dir, f"far_{timestamp}.txt")
-        with open(text_file, "w", encoding="utf-8") as f:
-            f.write(far_data["full_text"])
-        
-        # Save structured data
-        json_file = os.path.join(self.data_dir, f"far_{timestamp}.json")
-        with open(json_file, "w", encoding="utf-8") as f:
-            json.dump(far_data, f, indent=2, ensure_ascii=False)
-        
-        # Save as latest
+    def retry_failed_parts(self, concurrent: Optional[bool] = None) -> List[str]:
+        """Re-scrape only the parts recorded as failed, returning the links that still fail"""
+        if concurrent is None:
+            concurrent = Config.SCRAPE_CONCURRENT
+        
+        failed_links = self.journal.failed_links()
+        if not failed_links:
+            return []
+        
+        print(f"Retrying {len(failed_links)} failed FAR parts")
+        self.journal.reset_failures()
+        return self.scrape_links(failed_links, concurrent=concurrent)
+    
+    def iter_full_text(self, version_info: Dict, parts: Iterable[Tuple[str, Dict]]) -> Iterator[str]:
+        """Yield the combined plain-text rendering of the FAR one part at a time"""
+        yield self.format_text_header(version_info)
+        for _, part_data in parts:
+            yield self.format_part_text(part_data)
+    
+    def format_text_header(self, version_info: Dict) -> str:
+        return (
+            f"# Federal Acquisition Regulation (FAR)\n"
+            f"Version: {version_info.get('fac_number', 'Unknown')}\n"
+            f"Effective Date: {version_info.get('effective_date', 'Unknown')}\n"
+            f"Scraped: {version_info.get('scraped_at', 'Unknown')}\n\n"
+        )
+    
+    def format_part_text(self, part_data: Dict) -> str:
+        return f"\n\n## {part_data['title']}\nURL: {part_data['url']}\n\n{part_data['content']}"
+    
+    def write_version(self, version_info: Dict, parts: Iterable[Tuple[str, Dict]],
+                      part_hashes: Optional[Dict[str, str]] = None) -> str:
+        """Store parts in the blob store under a new version manifest and return its path.
+        
+        far_latest.txt is regenerated from the same single pass as a plain-text export.
+        If part_hashes is given it is filled with each part's content hash.
+        """
+        # Microseconds keep two scrapes within one second (e.g. a forced re-scrape) from sharing a manifest
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
         latest_text = os.path.join(self.data_dir, "far_latest.txt")
-        latest_json = os.path.join(self.data_dir, "far_latest.json")
         
-        with open(latest_text, "w", encoding="utf-8") as f:
-            f.write(far_data["full_text"])
+        with open(f"{latest_text}.tmp", "w", encoding="utf-8") as text_out:
+            text_out.write(self.format_text_header(version_info))
+            
+            def on_part(link: str, part_data: Dict):
+                text_out.write(self.format_part_text(part_data))
+                if part_hashes is not None:
+                    part_hashes[link] = part_hash(part_data)
+            
+            manifest_path = self.version_store.save_version(f"far_{timestamp}", version_info, parts, on_part)
+        os.replace(f"{latest_text}.tmp", latest_text)
         
-        with open(latest_json, "w", encoding="utf-8") as f:
-            json.dump(far_data, f, indent=2, ensure_ascii=False)
+        return manifest_path
+    
+    def save_far_data(self, far_data: Dict) -> str:
+        """Save FAR data to the version store"""
+        return self.write_version(far_data["version_info"], far_data["parts"].items())
+    
+    def load_far_data(self, file_path: str) -> Dict:
+        """Load a saved version (manifest, or legacy .txt/.jsonl/.json scrape) into the far_data dict shape.
         
-        return text_file
+        The parts of a manifest are decompressed only when accessed, so saving the result
+        to the database streams one part at a time. Callers that need the plain text
+        stream it with iter_full_text rather than holding it as one string.
+        """
+        header = self.read_saved_header(file_path)
+        parts = self.load_version_parts(file_path)
+        
+        version_info = header.get("version_info", {})
+        return {
+            "version_info": version_info,
+            "parts": parts,
+            "scraped_at": header.get("scraped_at")
+        }
     
-    def load_previous_version(self) -> Optional[Dict]:
-        """Load the previous version for comparison"""
+    def load_version_parts(self, file_path: str) -> Mapping[str, Dict]:
+        """Parts of a saved version; for manifests each part is decompressed only when accessed"""
+        if VersionStore.is_manifest(file_path):
+            return self.version_store.load_parts(file_path)
+        return dict(self.iter_saved_parts(file_path))
+    
+    def saved_data_path(self, file_path: str) -> str:
+        """Path of the structured data for a saved version: the manifest, or legacy .jsonl/.json"""
+        if VersionStore.is_manifest(file_path):
+            return file_path
+        base_path = os.path.splitext(file_path)[0]
+        if not os.path.exists(f"{base_path}.jsonl") and os.path.exists(f"{base_path}.json"):
+            return f"{base_path}.json"
+        return f"{base_path}.jsonl"
+    
+    def read_saved_header(self, file_path: str) -> Dict:
+        if VersionStore.is_manifest(file_path):
+            version_info = self.version_store.read_manifest(file_path)["version_info"]
+            return {"version_info": version_info, "scraped_at": version_info.get("scraped_at")}
+        
+        data_path = self.saved_data_path(file_path)
+        with open(data_path, "r", encoding="utf-8") as f:
+            if data_path.endswith(".json"):
+                legacy = json.load(f)
+                return {"version_info": legacy.get("version_info", {}), "scraped_at": legacy.get("scraped_at")}
+            return json.loads(f.readline())
+    
+    def iter_saved_parts(self, file_path: str) -> Iterator[Tuple[str, Dict]]:
+        """Stream (link, part_data) from a saved version"""
+        if VersionStore.is_manifest(file_path):
+            yield from self.version_store.iter_parts(file_path)
+            return
+        
+        data_path = self.saved_data_path(file_path)
+        with open(data_path, "r", encoding="utf-8") as f:
+            if data_path.endswith(".json"):
+                yield from json.load(f).get("parts", {}).items()
+                return
+            for line in f:
+                entry = json.loads(line)
+                if entry["type"] == "part":
+                    yield entry["link"], entry["part"]
+    
+    def load_versions(self) -> Dict:
+        """Read the version tracking file"""
         if not os.path.exists(self.version_file):
-            return None
-        
+            return {}
         try:
             with open(self.version_file, "r", encoding="utf-8") as f:
-                versions = json.load(f)
-            
-            if versions and "latest" in versions:
-                latest_file = versions["latest"]
-                if os.path.exists(latest_file):
-                    with open(latest_file, "r", encoding="utf-8") as f:
-                        return json.load(f)
+                return json.load(f)
         except Exception as e:
-            print(f"Error loading previous version: {e}")
+            print(f"Error reading version tracking: {e}")
+            return {}
+    
+    def save_versions(self, versions: Dict):
+        tmp_path = f"{self.version_file}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(versions, f, indent=2)
+        os.replace(tmp_path, self.version_file)
+    
+    def has_full_copy(self, file_path: Optional[str]) -> bool:
+        if VersionStore.is_manifest(file_path):
+            return self.version_store.is_complete(file_path)
+        return bool(file_path) and os.path.exists(self.saved_data_path(file_path))
+    
+    def write_version_delta(self, base_path: str, file_path: str, version_info: Dict) -> Tuple[str, Dict]:
+        """Record what changed from the version saved at base_path to the one at file_path.
+        
+        Every version's parts live in the version store, so the delta is only the change summary.
+        """
+        delta_path = file_path[:-len(VersionStore.MANIFEST_SUFFIX)] + ".delta.json"
+        summary = diff_versions(self.iter_saved_parts(base_path), self.iter_saved_parts(file_path))
+        write_delta(delta_path, summary, base_path, version_info)
+        print(f"Version delta: {summarize_changes(summary)}")
+        return delta_path, summary
+    
+    def get_version_changes(self, file_path: Optional[str] = None) -> Optional[Dict]:
+        """What changed in a version (default: latest) relative to the one before it"""
+        versions = self.load_versions()
+        file_path = file_path or versions.get("latest")
+        for entry in versions.get("versions", []):
+            if entry["file_path"] == file_path and entry.get("delta_path") and os.path.exists(entry["delta_path"]):
+                delta = read_delta(entry["delta_path"])
+                return {
+                    "fac_number": entry.get("fac_number"),
+                    "effective_date": entry.get("effective_date"),
+                    "base_path": entry.get("base_path", delta["base_path"]),
+                    "counts": summarize_changes(delta["summary"]),
+                    "changes": delta["summary"]
+                }
+        return None
+    
+    def compact_versions(self):
+        """Move versions saved as legacy full .txt/.json copies into the version store and drop their files"""
+        versions = self.load_versions()
+        entries = versions.get("versions", [])
+        migrated = {}
+        
+        for entry in entries:
+            old_path = entry["file_path"]
+            if VersionStore.is_manifest(old_path) or not self.has_full_copy(old_path):
+                continue
+            
+            name = os.path.splitext(os.path.basename(old_path))[0]
+            version_info = self.read_saved_header(old_path).get("version_info")
+            migrated[old_path] = self.version_store.save_version(name, version_info, self.iter_saved_parts(old_path))
+            entry["file_path"] = migrated[old_path]
+            for other in entries:
+                if other.get("base_path") == old_path:
+                    other["base_path"] = migrated[old_path]
+            print(f"Moved FAR version {old_path} into the blob store")
+        
+        if not migrated:
+            return
+        
+        versions["latest"] = migrated.get(versions.get("latest"), versions.get("latest"))
+        self.save_versions(versions)
+        
+        # Only remove legacy files once the tracking file points at the manifests
+        for old_path in migrated:
+            base_path = os.path.splitext(old_path)[0]
+            for ext in (".txt", ".jsonl", ".json"):
+                if os.path.exists(base_path + ext):
+                    os.remove(base_path + ext)
+        for name in ("far_latest.json", "far_latest.jsonl"):
+            legacy_latest = os.path.join(self.data_dir, name)
+            if os.path.exists(legacy_latest):
+                os.remove(legacy_latest)
+    
+    def load_previous_version(self) -> Optional[Dict]:
+        """Load the previous version's manifest for comparison, without reading any FAR text"""
+        if os.path.exists(self.manifest_file):
+            try:
+                with open(self.manifest_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Error loading version manifest: {e}")
+        
+        # Fall back to the newest entry in the version tracking file
+        versions = self.load_versions().get("versions", [])
+        if versions:
+            entry = versions[-1]
+            return {
+                "version_info": {
+                    "fac_number": entry.get("fac_number"),
+                    "effective_date": entry.get("effective_date"),
+                    "scraped_at": entry.get("scraped_at")
+                },
+                "files": {"version": entry.get("file_path"), "delta": entry.get("delta_path")},
+                "parts": {}
+            }
         
         return None
     
-    def update_version_tracking(self, new_data: Dict, file_path: str):
+    def write_manifest(self, version_info: Dict, file_path: str, part_hashes: Dict[str, str],
+                       delta_path: Optional[str] = None):
+        """Write the small manifest describing the latest saved version"""
+        manifest = {
+            "version_info": version_info,
+            "files": {
+                "version": file_path,
+                "text": os.path.join(self.data_dir, "far_latest.txt"),
+                "delta": delta_path
+            },
+            "parts": part_hashes
+        }
+        tmp_path = f"{self.manifest_file}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_file)
+    
+    def update_version_tracking(self, new_data: Dict, file_path: str, delta_path: Optional[str] = None,
+                                base_path: Optional[str] = None):
         """Update version tracking file"""
-        versions = {}
-        
-        if os.path.exists(self.version_file):
-            try:
-                with open(self.version_file, "r", encoding="utf-8") as f:
-                    versions = json.load(f)
-            except:
-                versions = {}
+        versions = self.load_versions()
         
         version_info = new_data["version_info"]
         fac_number = version_info.get("fac_number", "unknown")
@@ -227,41 +751,76 @@ class FARScraper:
         if "versions" not in versions:
             versions["versions"] = []
         
-        versions["versions"].append({
+        entry = {
             "fac_number": fac_number,
             "effective_date": version_info.get("effective_date"),
             "file_path": file_path,
             "scraped_at": version_info.get("scraped_at")
-        })
+        }
+        if delta_path:
+            entry["delta_path"] = delta_path
+            entry["base_path"] = base_path
+        versions["versions"].append(entry)
         
         versions["latest"] = file_path
         
-        with open(self.version_file, "w", encoding="utf-8") as f:
-            json.dump(versions, f, indent=2)
+        self.save_versions(versions)
     
-    def run_scrape(self) -> str:
-        """Main method to run the scraping process"""
-        print("Starting FAR scraping process...")
+    def run_scrape(self, stored_version: Optional[Dict] = None, force: bool = False) -> str:
+        """Main method to run the scraping process.
         
-        # Check if we need to scrape (compare versions)
-        current_version = self.get_current_version_info()
-        previous_data = self.load_previous_version()
+        An unchanged FAR version is only skipped while its complete saved copy still exists, or
+        when stored_version (the latest version already in the database) is that same version.
+        force scrapes every part again, ignoring the saved version and any interrupted journal.
         
-        if previous_data:
-            prev_version = previous_data["version_info"]
-            if (current_version.get("fac_number") == prev_version.get("fac_number") and 
-                current_version.get("effective_date") == prev_version.get("effective_date")):
-                print("FAR version hasn't changed. Skipping scrape.")
-                return os.path.join(self.data_dir, "far_latest.txt")
+        Raises RuntimeError if parts still fail after their retry. Nothing is saved in that
+        case; the journal is kept, so the next run fetches only the failed parts.
+        """
+        print("Starting FAR scraping process...")
         
-        # Scrape new data
-        far_data = self.scrape_all_far()
+        # Check if we need to scrape (compare versions); the index is reused by scrape_to_journal
+        current_version, _ = self.fetch_index(refresh=True)
+        previous_manifest = None if force else self.load_previous_version()
         
-        # Save data
-        file_path = self.save_far_data(far_data)
+        if previous_manifest and same_version(current_version, previous_manifest["version_info"]):
+            previous_path = previous_manifest["files"].get("version") or self.load_versions().get("latest")
+            if self.has_full_copy(previous_path) or (stored_version and same_version(current_version, stored_version)):
+                print("FAR version hasn't changed. Skipping scrape.")
+                self.last_run_skipped = True
+                self.last_version_info = previous_manifest["version_info"]
+                return previous_path
+            print("FAR version hasn't changed, but its saved copy is missing. Scraping again.")
+        
+        # Scrape new data into the journal, resuming an interrupted run and retrying failed parts once
+        version_info = self.scrape_to_journal(resume=not force)
+        self.last_run_skipped = False
+        self.last_version_info = version_info
+        
+        # A partial scrape never becomes the latest version
+        failed_links = self.journal.failed_links()
+        if failed_links:
+            raise RuntimeError(
+                f"{len(failed_links)} FAR parts failed after a retry ({', '.join(failed_links[:5])}); "
+                f"the next run resumes with them"
+            )
+        
+        # Stream the journal into the version store
+        part_hashes = {}
+        file_path = self.write_version(version_info, self.journal.iter_parts(), part_hashes)
+        
+        # Record only what changed relative to the previous version
+        base_path = self.load_versions().get("latest")
+        delta_path = None
+        if Config.FAR_VERSION_DELTAS and self.has_full_copy(base_path):
+            delta_path, _ = self.write_version_delta(base_path, file_path, version_info)
         
         # Update version tracking
-        self.update_version_tracking(far_data, file_path)
+        self.update_version_tracking({"version_info": version_info}, file_path, delta_path, base_path)
+        self.write_manifest(version_info, file_path, part_hashes, delta_path)
+        self.journal.clear()
+        
+        if Config.FAR_COMPACT_VERSIONS:
+            self.compact_versions()
         
         print(f"FAR scraping completed. Data saved to: {file_path}")
         return file_path
@@ -0,0 +1,112 @@
+"""
+FAR chatbot that answers from the regulation passages most relevant to each question
+"""
+
+import logging
+import re
+from typing import Dict, List, Optional
+
+from answer_cache import answer_cache
+from config import Config
+from database import db_manager
+from far_structure import SECTION_NUMBER_RE
+from retriever import hybrid_retriever
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = """You are FAR Bot, an assistant for the Federal Acquisition Regulation (FAR).
+Answer using only the FAR excerpts provided. Cite section numbers (e.g. FAR 52.212-4) for every point you make.
+If the excerpts do not answer the question, say so instead of guessing."""
+
+# Words that, next to section numbers, still only ask to see the text ("show me FAR 52.212-4")
+LOOKUP_WORDS = frozenset("""
+    a about and cite clause clauses display does far full get give i is me of please print provision provisions
+    quote read say says section sections see show tell text the to view want what whats
+""".split())
+
+class SimpleFARChatbot:
+    """Retrieves the top-k FAR chunks for a question and asks the LLM to answer from them"""
+
+    def __init__(self):
+        self.client = Config.get_openai_client()
+        self.openai_available = self.client is not None
+
+    def retrieve(self, question: str, k: int = None) -> List[Dict]:
+        """The chunks most relevant to the question, from full-text and (with an API key) vector search"""
+        return hybrid_retriever.retrieve(question, k, use_vector=self.openai_available)
+
+    def lookup_sections(self, question: str) -> Optional[List[Dict]]:
+        """The sections a question only asks to see, or None if it needs an actual answer"""
+        section_ids = list(dict.fromkeys(SECTION_NUMBER_RE.findall(question)))
+        if not section_ids or len(section_ids) > Config.FAST_PATH_MAX_SECTIONS:
+            return None
+        # Drop apostrophes first, so "what's" is one word rather than "what" and "s"
+        words = re.findall(r"[a-z]+", re.sub(r"['’]", "", SECTION_NUMBER_RE.sub(" ", question.lower())))
+        if any(word not in LOOKUP_WORDS for word in words):
+            return None
+
+        sections = [db_manager.get_far_section(section_id) for section_id in section_ids]
+        # An unknown number goes to the model, which can say it does not exist
+        return sections if all(sections) else None
+
+    def answer_from_sections(self, question: str) -> Optional[str]:
+        """Verbatim text of the sections a lookup question names, with citations; None for other questions"""
+        sections = self.lookup_sections(question)
+        if not sections:
+            return None
+
+        version = db_manager.get_latest_far_version()
+        fac = f", FAC {version['fac_number']}" if version else ""
+        return "\n\n".join(
+            f"FAR {section['section_id']} {section['title'] or ''}".rstrip()
+            + f"\n\n{section['text'].strip()}\n\nSource: {section['url']}{fac}"
+            for section in sections
+        )
+
+    def format_context(self, chunks: List[Dict]) -> str:
+        """Excerpts with their citations, cut off at RAG_MAX_CONTEXT_CHARS"""
+        excerpts = []
+        remaining = Config.RAG_MAX_CONTEXT_CHARS
+        for chunk in chunks:
+            heading = f"[FAR {chunk['ref']} {chunk['title']}]" if chunk['kind'] == 'section' else f"[{chunk['title']}]"
+            excerpt = f"{heading}\n{chunk['text'].strip()}"[:remaining]
+            excerpts.append(excerpt)
+            remaining -= len(excerpt)
+            if remaining <= 0:
+                break
+        return "\n\n".join(excerpts)
+
+    def ask_question(self, question: str) -> str:
+        """Answer a question about the FAR, reusing the cached answer to the same or a near-identical question"""
+        if Config.ANSWER_CACHE_ENABLED and self.openai_available:
+            cached = answer_cache.get(question)
+            if cached is not None:
+                return cached
+
+        chunks = self.retrieve(question)
+        if not chunks:
+            return "I couldn't find anything in the FAR about that. Try rephrasing, or ask about a specific section."
+
+        context = self.format_context(chunks)
+        if not self.openai_available:
+            return f"AI answers are unavailable (no OpenAI API key). The most relevant FAR text is:\n\n{context}"
+
+        version = db_manager.get_latest_far_version()
+        fac = f" (FAC {version['fac_number']}, effective {version['effective_date']})" if version else ""
+        try:
+            response = self.client.chat.completions.create(
+                model=Config.OPENAI_MODEL,
+                temperature=Config.OPENAI_TEMPERATURE,
+                max_tokens=Config.MAX_TOKENS,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": f"FAR excerpts{fac}:\n\n{context}\n\nQuestion: {question}"}
+                ]
+            )
+            answer = response.choices[0].message.content.strip()
+            if Config.ANSWER_CACHE_ENABLED:
+                answer_cache.put(question, answer, version['id'] if version else None)
+            return answer
+        except Exception as e:
+            logger.error(f"OpenAI request failed: {e}")
+            return f"Sorry, I couldn't reach the AI service. The most relevant FAR text is:\n\n{context}"
@@ -0,0 +1,443 @@
+"""
+Storage backend interface for FAR Bot, with the logic shared by every backend
+"""
+
+import atexit
+import base64
+import hashlib
+import html
+import json
+import logging
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import Config
+from far_diff import part_hash
+
+logger = logging.getLogger(__name__)
+
+# Control characters the database wraps search matches in, since FAR text may contain markup
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+def utc_timestamp() -> str:
+    """Current time in the format of SQLite's CURRENT_TIMESTAMP"""
+    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+
+def highlight_html(text: Optional[str]) -> str:
+    """HTML-escape highlighted search text, then turn the match markers into <mark> tags"""
+    return html.escape(text or "").replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_END, "</mark>")
+
+class WriteBehindWriter:
+    """Bounded queue of inserts flushed in batched transactions by a background thread"""
+
+    def __init__(self, db: "StorageBackend", max_size: int, flush_interval: float, batch_size: int):
+        self.db = db
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=max_size)
+        self._stop = object()
+        self._thread = threading.Thread(target=self._run, name="db-write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, sql: str, params: Tuple, timeout: float) -> bool:
+        """Queue an insert, waiting up to timeout for space; False if the queue stayed full"""
+        try:
+            self.queue.put((sql, params), timeout=timeout)
+            return True
+        except queue.Full:
+            return False
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+
+            # Gather more rows until the batch is full or the flush interval has passed
+            while item is not self._stop and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+
+            stopping = batch[-1] is self._stop
+            rows = batch[:-1] if stopping else batch
+            try:
+                if rows:
+                    self._write(rows)
+            except Exception as e:
+                # The thread must survive any failure, or flush() would wait forever
+                logger.error(f"Dropped {len(rows)} queued database writes: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+            if stopping:
+                return
+
+    def _write(self, rows: List[Tuple[str, Tuple]]):
+        try:
+            with self.db.get_connection() as conn:
+                cursor = conn.cursor()
+                for sql, params in rows:
+                    cursor.execute(sql, params)
+                conn.commit()
+        except Exception:
+            # Retry one row at a time so a single bad row does not lose the batch
+            for sql, params in rows:
+                try:
+                    with self.db.get_connection() as conn:
+                        conn.cursor().execute(sql, params)
+                        conn.commit()
+                except Exception as e:
+                    logger.error(f"Dropped queued database write: {e}")
+
+    def flush(self):
+        """Block until every queued write has been committed"""
+        self.queue.join()
+
+    def stop(self):
+        """Flush remaining writes and stop the background thread"""
+        if self._thread.is_alive():
+            self.queue.put(self._stop)
+            self._thread.join()
+
+class StorageBackend(ABC):
+    """Base class for FAR Bot storage backends
+
+    Subclasses provide the SQL dialect and connection handling; caching of the latest
+    FAR version, write-behind, stats caching, pagination cursors and version hashing
+    are shared here.
+    """
+
+    # Bind parameter marker of the driver, and the inserts used by save_chat_message and log_scraping_result
+    PLACEHOLDER: str
+    # Comparison of a row's (timestamp, id) with a bound key, in the backend's dialect; {op} is the operator
+    KEY_COMPARISON: str
+    CHAT_INSERT_SQL: str
+    SCRAPING_LOG_INSERT_SQL: str
+
+    def __init__(self):
+        self._stats_cache: Optional[Tuple[float, Dict]] = None
+        self._far_cache_lock = threading.Lock()
+        self.invalidate_far_cache()
+        self.writer = None
+
+    def start_write_behind(self):
+        """Queue chat and scraping log inserts if DB_WRITE_BEHIND is enabled"""
+        if Config.DB_WRITE_BEHIND:
+            self.writer = WriteBehindWriter(
+                self,
+                max_size=Config.DB_WRITE_QUEUE_SIZE,
+                flush_interval=Config.DB_FLUSH_INTERVAL,
+                batch_size=Config.DB_FLUSH_BATCH_SIZE
+            )
+            atexit.register(self.writer.stop)
+
+    # Backend-specific operations
+
+    @abstractmethod
+    def init_database(self):
+        """Create or migrate the schema"""
+
+    @abstractmethod
+    def get_connection(self):
+        """Context manager yielding a DB-API connection"""
+
+    @abstractmethod
+    def save_far_data(self, far_data: Dict) -> int:
+        """Save a FAR version with its parts and sections and make it the latest; returns its id"""
+
+    @abstractmethod
+    def get_far_part(self, part: str, version_id: Optional[int] = None) -> Optional[Dict]:
+        """Get one part of a FAR version (default: latest) by part number or link"""
+
+    @abstractmethod
+    def iter_far_parts(self, version_id: Optional[int] = None) -> Iterator[Dict]:
+        """Stream the parts of a FAR version (default: latest) in scrape order"""
+
+    @abstractmethod
+    def get_far_section(self, section_id: str, version_id: Optional[int] = None) -> Optional[Dict]:
+        """Get one section of a FAR version (default: latest) by section number"""
+
+    @abstractmethod
+    def search_far(self, query: str, limit: int = 10, version_id: Optional[int] = None,
+                   match_all: bool = True) -> List[Dict]:
+        """Full-text search over FAR sections, best match first"""
+
+    @abstractmethod
+    def clear_chat_history(self, session_id: str = None) -> int:
+        """Clear chat history"""
+
+    @abstractmethod
+    def cleanup_old_data(self, days_to_keep: int = 30) -> Dict:
+        """Delete old FAR versions, chat history and scraping logs"""
+
+    @abstractmethod
+    def _read_far_generation(self) -> int:
+        """Counter that changes whenever far_data changes"""
+
+    @abstractmethod
+    def _query_latest_far_version(self) -> Optional[Dict]:
+        """id, fac_number, effective_date and scraped_at of the latest version"""
+
+    @abstractmethod
+    def _execute_insert(self, sql: str, params: Tuple) -> Optional[int]:
+        """Run one insert in its own transaction and return the new row id"""
+
+    @abstractmethod
+    def _iter_rows(self, sql: str, params: Tuple) -> Iterator[Dict]:
+        """Stream the rows of a query as dicts, holding one connection until they are exhausted"""
+
+    @abstractmethod
+    def _compute_stats(self) -> Dict:
+        """Row counts, latest version and 7-day scraping success rate"""
+
+    def incremental_vacuum(self, max_pages: int = None) -> int:
+        """Return free space to the OS where the backend needs it; returns pages freed"""
+        return 0
+
+    def close(self):
+        """Drain queued writes; subclasses also close their connections"""
+        if self.writer:
+            self.writer.stop()
+            self.writer = None
+
+    # Latest FAR version cache
+
+    def invalidate_far_cache(self):
+        """Drop the cached latest FAR version; the next read reloads it"""
+        with self._far_cache_lock:
+            self._far_generation = None
+            self._far_checked_at = 0.0
+            self._latest_version = None
+            self._latest_data = None
+
+    def _check_far_generation(self):
+        """Invalidate the cache if any process has changed far_data, checking at most every FAR_CACHE_CHECK_INTERVAL"""
+        now = time.monotonic()
+        if self._far_generation is not None and now - self._far_checked_at < Config.FAR_CACHE_CHECK_INTERVAL:
+            return
+
+        generation = self._read_far_generation()
+        if generation != self._far_generation:
+            self._latest_version = None
+            self._latest_data = None
+            self._far_generation = generation
+        self._far_checked_at = now
+
+    def get_latest_far_data(self) -> Optional[Dict]:
+        """Get the latest FAR data, including every part (cached)"""
+        with self._far_cache_lock:
+            self._check_far_generation()
+            if self._latest_data is not None:
+                return self._copy_far_data(self._latest_data)
+
+        version = self.get_latest_far_version()
+        if not version:
+            return None
+
+        far_data = {
+            'id': version['id'],
+            'fac_number': version['fac_number'],
+            'effective_date': version['effective_date'],
+            'parts': {part['link']: self._part_data(part) for part in self.iter_far_parts(version['id'])},
+            'scraped_at': version['scraped_at'],
+            'version_info': {
+                'fac_number': version['fac_number'],
+                'effective_date': version['effective_date'],
+                'scraped_at': version['scraped_at']
+            }
+        }
+
+        with self._far_cache_lock:
+            # Keep it only if the latest version did not change while loading
+            if self._latest_version is not None and self._latest_version['id'] == version['id']:
+                self._latest_data = far_data
+        return self._copy_far_data(far_data)
+
+    @staticmethod
+    def _copy_far_data(far_data: Dict) -> Dict:
+        """A copy callers can change without touching the cache; the part dicts are copied, not their text"""
+        return dict(
+            far_data,
+            parts={link: dict(part) for link, part in far_data['parts'].items()},
+            version_info=dict(far_data['version_info'])
+        )
+
+    def get_latest_far_version(self) -> Optional[Dict]:
+        """Get metadata of the latest FAR version without loading its text (cached)"""
+        with self._far_cache_lock:
+            self._check_far_generation()
+            if self._latest_version is not None:
+                return dict(self._latest_version)
+            generation = self._far_generation
+
+        version = self._query_latest_far_version()
+        if not version:
+            return None
+        with self._far_cache_lock:
+            if self._far_generation == generation:
+                self._latest_version = dict(version)
+        return version
+
+    def _resolve_version(self, version_id: Optional[int]) -> Optional[int]:
+        if version_id is not None:
+            return version_id
+        version = self.get_latest_far_version()
+        return version['id'] if version else None
+
+    def _part_data(self, part: Dict) -> Dict:
+        """Part row in the shape the scraper produces"""
+        part_data = {
+            'title': part['title'],
+            'content': part['content'],
+            'url': part['url'],
+            'scraped_at': part['scraped_at']
+        }
+        if part['structure']:
+            part_data['structure'] = part['structure']
+        if part['error']:
+            part_data['error'] = part['error']
+        return part_data
+
+    # Chat history and scraping logs
+
+    def _write(self, sql: str, params: Tuple) -> Optional[int]:
+        """Run an insert now, or queue it when write-behind is enabled (returns None when queued)"""
+        if self.writer:
+            if self.writer.submit(sql, params, timeout=Config.DB_WRITE_QUEUE_TIMEOUT):
+                return None
+            # Backpressure: the writer is not keeping up, so this caller pays for its own insert
+            logger.warning("Write-behind queue full, writing synchronously")
+
+        return self._execute_insert(sql, params)
+
+    def flush_writes(self):
+        """Wait for queued write-behind inserts to be committed"""
+        if self.writer:
+            self.writer.flush()
+
+    def save_chat_message(self, session_id: str, question: str, answer: str,
+                         user_ip: str = None, response_time_ms: int = None) -> Optional[int]:
+        """Save chat message to database; returns None when the write is queued"""
+        return self._write(self.CHAT_INSERT_SQL, (
+            session_id, question, answer, user_ip, response_time_ms, utc_timestamp()
+        ))
+
+    def log_scraping_result(self, status: str, fac_number: str = None,
+                           effective_date: str = None, error_message: str = None,
+                           records_scraped: int = None, execution_time_seconds: float = None):
+        """Log scraping operation result"""
+        self._write(self.SCRAPING_LOG_INSERT_SQL, (
+            status, fac_number, effective_date, error_message,
+            records_scraped, execution_time_seconds, utc_timestamp()
+        ))
+
+    def _encode_cursor(self, timestamp: str, row_id: int) -> str:
+        return base64.urlsafe_b64encode(json.dumps([str(timestamp), row_id]).encode("utf-8")).decode("ascii")
+
+    def _decode_cursor(self, cursor: str) -> Tuple[str, int]:
+        try:
+            timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            return str(timestamp), int(row_id)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    def _keyset_page(self, table: str, where: str, params: Tuple, limit: int,
+                     cursor: Optional[str]) -> Tuple[Iterator[Dict], Optional[str]]:
+        """One page of rows, newest first, after the (timestamp, id) position in cursor
+
+        Returns a lazy row iterator and the cursor for the next page (None on the last page).
+        The page's keys are read first, with one extra to tell whether another page follows;
+        the rows are then streamed between the page's first and last key, so the next cursor
+        is the last row streamed even if rows are written in between. Seeking on the
+        (timestamp, id) index makes every page cost the same as the first.
+        """
+        base_conditions = [where] if where else []
+        conditions = list(base_conditions)
+        key_params = params
+        if cursor:
+            conditions.append(self.KEY_COMPARISON.format(op="<"))
+            key_params = params + self._decode_cursor(cursor)
+
+        keys = [(row['timestamp'], row['id']) for row in self._iter_rows(f"""
+            SELECT timestamp, id FROM {table} {self._where_sql(conditions)}
+            ORDER BY timestamp DESC, id DESC
+            LIMIT {self.PLACEHOLDER}
+        """, key_params + (limit + 1,))]
+        if not keys:
+            return iter(()), None
+        next_cursor = self._encode_cursor(*keys[limit - 1]) if len(keys) > limit else None
+
+        conditions = base_conditions + [self.KEY_COMPARISON.format(op="<="), self.KEY_COMPARISON.format(op=">=")]
+        first, last = keys[0], keys[min(limit, len(keys)) - 1]
+        return self._iter_rows(f"""
+            SELECT * FROM {table} {self._where_sql(conditions)}
+            ORDER BY timestamp DESC, id DESC
+        """, params + first + last), next_cursor
+
+    def _where_sql(self, conditions: List[str]) -> str:
+        return f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    def page_chat_history(self, session_id: str = None, limit: int = 50,
+                          cursor: str = None) -> Tuple[Iterator[Dict], Optional[str]]:
+        """Stream a page of chat history (newest first) and return the next page's cursor"""
+        if session_id:
+            return self._keyset_page("chat_history", f"session_id = {self.PLACEHOLDER}", (session_id,), limit, cursor)
+        return self._keyset_page("chat_history", "", (), limit, cursor)
+
+    def get_chat_history(self, session_id: str = None, limit: int = 50, cursor: str = None) -> List[Dict]:
+        """Get chat history from database"""
+        rows, _ = self.page_chat_history(session_id, limit, cursor)
+        return list(rows)
+
+    def page_scraping_logs(self, limit: int = 100, cursor: str = None) -> Tuple[Iterator[Dict], Optional[str]]:
+        """Stream a page of scraping logs (newest first) and return the next page's cursor"""
+        return self._keyset_page("scraping_logs", "", (), limit, cursor)
+
+    def get_scraping_logs(self, limit: int = 100, cursor: str = None) -> List[Dict]:
+        """Get scraping logs from database"""
+        rows, _ = self.page_scraping_logs(limit, cursor)
+        return list(rows)
+
+    def get_database_stats(self) -> Dict:
+        """Get database statistics, cached for STATS_CACHE_TTL seconds"""
+        cached = self._stats_cache
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        stats = self._compute_stats()
+        self._stats_cache = (time.monotonic() + Config.STATS_CACHE_TTL, stats)
+        return stats
+
+    # Deduplication
+
+    def _version_hash(self, fac_number: str, effective_date: str, parts) -> str:
+        """Merkle-style hash: the version fields plus each part's link and content hash, sorted by link.
+
+        Sorting makes the hash independent of the order parts were scraped or stored in,
+        so an unchanged re-scrape always deduplicates.
+        """
+        part_hashes = sorted((link, part_hash(part_data)) for link, part_data in parts)
+        digest = hashlib.sha256()
+        digest.update(f"{fac_number or ''}\0{effective_date or ''}\0".encode("utf-8"))
+        for link, content_hash in part_hashes:
+            digest.update(f"{link}\0{content_hash}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _calculate_hash(self, data: Dict) -> str:
+        """Calculate content hash for data deduplication, ignoring scrape timestamps"""
+        return self._version_hash(
+            data['version_info'].get('fac_number', ''),
+            data['version_info'].get('effective_date', ''),
+            data['parts'].items()
+        )
@@ -0,0 +1,94 @@
+"""
+Shared fixtures for the FAR Bot test suite
+"""
+
+import os
+import sys
+import tempfile
+
+# Point every global (database, vector index, scraper data) at a scratch directory before
+# any project module reads Config. A PostgreSQL DATABASE_URL is kept for the backend tests
+# only, so the module-level storage stays on SQLite.
+POSTGRES_URL = os.environ.get("DATABASE_URL", "")
+_scratch = tempfile.mkdtemp(prefix="far_bot_tests_")
+os.environ["DATABASE_URL"] = ""
+os.environ["DATABASE_PATH"] = os.path.join(_scratch, "far_bot.db")
+os.environ["VECTOR_INDEX_DIR"] = os.path.join(_scratch, "far_index")
+os.environ["DATA_DIR"] = os.path.join(_scratch, "data")
+os.environ["OPENAI_API_KEY"] = ""
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from far_structure import extract_structure
+
+def make_part(part_id: str, sections: list) -> dict:
+    """A scraped part with a structure, from (section number, title, text) tuples"""
+    title = f"PART {part_id} - TEST PART {part_id}"
+    blocks = [title]
+    for section_id, section_title, text in sections:
+        blocks += [f"{section_id} {section_title}", text]
+    return {
+        "title": title,
+        "url": f"https://www.acquisition.gov/far/part-{part_id}",
+        "content": " ".join(blocks),
+        "structure": extract_structure(part_id, title, blocks),
+        "scraped_at": "2026-01-01T00:00:00"
+    }
+
+def make_far_data(fac_number: str = "2025-06", parts: dict = None) -> dict:
+    """FAR data in the shape FARScraper.load_far_data returns"""
+    if parts is None:
+        parts = {
+            "/far/part-15": make_part("15", [
+                ("15.404-1", "Proposal analysis techniques.", "Price analysis compares proposed prices."),
+                ("15.406-2", "Certificate of current cost or pricing data.", "The contractor shall certify the data.")
+            ]),
+            "/far/part-52": make_part("52", [
+                ("52.212-4", "Contract Terms and Conditions-Commercial Products.", "Inspection and acceptance terms apply.")
+            ])
+        }
+    return {
+        "version_info": {"fac_number": fac_number, "effective_date": "2025-10-01"},
+        "parts": parts,
+        "scraped_at": "2026-01-01T00:00:00"
+    }
+
+# Dropped before each PostgreSQL test, so DATABASE_URL must point at a scratch database
+POSTGRES_TABLES = ("far_sections", "far_parts", "far_data", "chat_history", "scraping_logs",
+                   "table_counts", "scraping_hourly", "far_generation")
+
+def reset_postgres(dsn: str):
+    import psycopg2
+    conn = psycopg2.connect(dsn)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {', '.join(POSTGRES_TABLES)} CASCADE")
+        conn.commit()
+    finally:
+        conn.close()
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def storage(request, tmp_path):
+    """A fresh storage backend: SQLite, and PostgreSQL when DATABASE_URL is set"""
+    if request.param == "sqlite":
+        from database import DatabaseManager
+        backend = DatabaseManager(str(tmp_path / "far_bot.db"))
+    else:
+        if not POSTGRES_URL.startswith(("postgres://", "postgresql://")):
+            pytest.skip("DATABASE_URL is not set to a PostgreSQL database")
+        pytest.importorskip("psycopg2")
+        from postgres_storage import PostgresStorage
+        reset_postgres(POSTGRES_URL)
+        backend = PostgresStorage(POSTGRES_URL)
+    yield backend
+    backend.close()
+
+@pytest.fixture
+def sqlite_storage(tmp_path):
+    """A fresh SQLite storage backend, for behaviour specific to SQLite"""
+    from database import DatabaseManager
+    backend = DatabaseManager(str(tmp_path / "far_bot.db"))
+    yield backend
+    backend.close()
@@ -0,0 +1,37 @@
+"""
+Tests for the per-version answer cache
+"""
+
+import numpy as np
+import pytest
+
+import answer_cache
+from conftest import make_far_data
+
+@pytest.fixture
+def cache(sqlite_storage, monkeypatch):
+    """An answer cache over a fresh database, where every question embeds to the same vector"""
+    monkeypatch.setattr(answer_cache, "db_manager", sqlite_storage)
+    cache = answer_cache.AnswerCache(max_entries=10, ttl=60, similarity=0.95)
+    monkeypatch.setattr(cache, "_embed", lambda question: np.array([1.0, 0.0], dtype=np.float32))
+    cache.version_id = sqlite_storage.save_far_data(make_far_data())
+    return cache
+
+def test_exact_match_ignores_case_and_punctuation(cache):
+    cache.put("What is FAR 52.212-4?", "answer", cache.version_id)
+
+    assert cache.get("what is far 52.212-4") == "answer"
+    assert cache.hits_exact == 1
+
+def test_semantic_match_requires_the_same_sections(cache):
+    cache.put("What does FAR 52.212-4 require?", "answer about 52.212-4", cache.version_id)
+
+    assert cache.get("What does FAR 52.212-5 require?") is None
+    assert cache.get("What does 52.212-4 require of contractors?") == "answer about 52.212-4"
+    assert cache.hits_semantic == 1
+
+def test_semantic_match_without_sections(cache):
+    cache.put("What are the small business set-aside rules?", "set-asides", cache.version_id)
+
+    assert cache.get("Explain small business set-asides") == "set-asides"
+    assert cache.get("Explain small business set-asides under 19.502-2") is None
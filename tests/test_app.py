@@ -0,0 +1,21 @@
+"""
+Tests for the Flask API's request handling
+"""
+
+import pytest
+
+@pytest.fixture
+def client():
+    from app import app
+    return app.test_client()
+
+@pytest.mark.parametrize("requested, used", [("-1", 1), ("0", 1), ("5", 5), ("1000", 100)])
+def test_search_limit_is_clamped(client, monkeypatch, requested, used):
+    import app
+    limits = []
+    monkeypatch.setattr(app.db_manager, "search_far", lambda query, limit, match_all: limits.append(limit) or [])
+
+    response = client.get(f"/api/search?q=price&limit={requested}")
+
+    assert response.status_code == 200
+    assert limits == [used]
@@ -0,0 +1,32 @@
+"""
+Tests for the vector index lifecycle
+"""
+
+import pytest
+
+import far_index
+from conftest import make_far_data
+
+@pytest.fixture
+def index_builds(sqlite_storage, monkeypatch):
+    """Versions the vector index was built for, with far_index using a fresh database"""
+    builds = []
+    monkeypatch.setattr(far_index, "db_manager", sqlite_storage)
+    monkeypatch.setattr(far_index.vector_index, "build",
+                        lambda version=None: builds.append(sqlite_storage.get_latest_far_version()['id']))
+    return builds
+
+def test_save_and_index_builds_the_saved_version(index_builds):
+    record_id = far_index.save_and_index(make_far_data())
+
+    assert index_builds == [record_id]
+
+def test_save_and_index_survives_index_failures(sqlite_storage, monkeypatch):
+    def fail(version=None):
+        raise RuntimeError("OpenAI API key is required to build embeddings")
+    monkeypatch.setattr(far_index, "db_manager", sqlite_storage)
+    monkeypatch.setattr(far_index.vector_index, "build", fail)
+
+    record_id = far_index.save_and_index(make_far_data())
+
+    assert sqlite_storage.get_latest_far_version()['id'] == record_id
@@ -0,0 +1,57 @@
+"""
+Tests for the FAR part parser backends
+"""
+
+import pytest
+
+from far_parser import available_backends, get_parser
+
+@pytest.fixture(params=available_backends())
+def parser(request):
+    return get_parser(request.param)
+
+def test_first_content_region_wins(parser):
+    html = """<html><head><title>Page</title></head><body>
+        <h1>PART 15 - CONTRACTING BY NEGOTIATION</h1>
+        <div class="field-item"><p>15.404-1 Proposal analysis techniques.</p><p>Price analysis.</p></div>
+        <article><p>Sidebar text</p></article>
+    </body></html>"""
+
+    parsed = parser.parse(html, "/far/part-15")
+
+    assert parsed.title == "PART 15 - CONTRACTING BY NEGOTIATION"
+    assert parsed.blocks == ["15.404-1 Proposal analysis techniques.", "Price analysis."]
+
+def test_empty_content_region_falls_back_to_the_whole_page(parser):
+    html = """<html><head><title>Page</title></head><body>
+        <h1>PART 15</h1>
+        <div class="field-item">  </div>
+        <section><p>15.404-1 Proposal analysis techniques.</p></section>
+    </body></html>"""
+
+    parsed = parser.parse(html, "/far/part-15")
+
+    assert "15.404-1 Proposal analysis techniques." in parsed.blocks
+    assert parsed.content.endswith("15.404-1 Proposal analysis techniques.")
+
+def test_page_without_content_region_uses_the_whole_page(parser):
+    parsed = parser.parse("<html><body><p>Only text</p></body></html>", "/far/part-1")
+
+    assert parsed.title == "/far/part-1"
+    assert parsed.blocks == ["Only text"]
+
+def test_backend_missing_a_method_fails_when_created():
+    from far_parser import TreeBackend
+
+    class Incomplete(TreeBackend):
+        def parse(self, html, fallback_title):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_missing_parser_modules_are_unavailable():
+    from far_parser import module_available
+
+    assert module_available("html.parser")
+    assert not module_available("no_such_package.lexbor")
@@ -0,0 +1,38 @@
+"""
+Tests for the retrieval stages' worker pools
+"""
+
+import threading
+import time
+
+from retriever import SearchStage, rrf_scores
+
+def test_busy_stage_skips_new_searches_until_a_worker_frees_up():
+    stage = SearchStage("Test", workers=1)
+    release = threading.Event()
+    slow = stage.submit(release.wait, 5)
+
+    # The slow search misses its budget but keeps running on the only worker
+    assert stage.collect(slow, time.monotonic() + 0.01) == []
+    assert stage.submit(lambda: ["hit"]) is None
+
+    release.set()
+    slow.result(timeout=5)
+    deadline = time.monotonic() + 5
+    while stage.in_flight and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert stage.collect(stage.submit(lambda: ["hit"]), time.monotonic() + 5) == ["hit"]
+
+def test_failed_search_contributes_nothing():
+    stage = SearchStage("Test", workers=2)
+
+    def fail():
+        raise RuntimeError("database is locked")
+
+    assert stage.collect(stage.submit(fail), time.monotonic() + 5) == []
+    assert stage.collect(None, time.monotonic() + 5) == []
+
+def test_rrf_favours_keys_ranked_well_in_both_rankings():
+    scores = rrf_scores([[("section", "a"), ("section", "b")], [("section", "b"), ("section", "c")]], k=60)
+
+    assert max(scores, key=scores.get) == ("section", "b")
@@ -0,0 +1,211 @@
+"""
+Tests for the FAR scraper's version handling
+"""
+
+import json
+import os
+
+import pytest
+
+from conftest import make_part
+
+VERSION = {"fac_number": "2025-06", "effective_date": "2025-10-01"}
+PARTS = {
+    "/far/part-15": make_part("15", [("15.404-1", "Proposal analysis techniques.", "Price analysis.")]),
+    "/far/part-52": make_part("52", [("52.212-4", "Contract Terms and Conditions.", "Inspection terms.")])
+}
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    """A scraper whose index and part pages come from PARTS instead of the network"""
+    from scrape_far import FARScraper
+    scraper = FARScraper(data_dir=str(tmp_path), use_cache=False)
+    monkeypatch.setattr(scraper, "fetch_index", lambda refresh=False: (dict(VERSION), list(PARTS)))
+    monkeypatch.setattr(scraper, "scrape_far_part", lambda link, structured=None: dict(PARTS[link]))
+    yield scraper
+    scraper.close()
+
+def test_unchanged_version_with_saved_copy_is_skipped(scraper):
+    first = scraper.run_scrape()
+    assert not scraper.last_run_skipped
+
+    assert scraper.run_scrape() == first
+    assert scraper.last_run_skipped
+
+def test_unchanged_version_without_saved_copy_is_scraped(scraper):
+    # A tracking file committed without the data it points at
+    with open(scraper.version_file, "w", encoding="utf-8") as f:
+        json.dump({"versions": [dict(VERSION, file_path="data/far_missing.manifest.json")],
+                   "latest": "data/far_missing.manifest.json"}, f)
+
+    file_path = scraper.run_scrape()
+
+    assert not scraper.last_run_skipped
+    assert os.path.exists(file_path)
+    assert set(scraper.load_far_data(file_path)["parts"]) == set(PARTS)
+
+def test_unchanged_version_already_stored_is_skipped(scraper):
+    with open(scraper.version_file, "w", encoding="utf-8") as f:
+        json.dump({"versions": [dict(VERSION, file_path="data/far_missing.manifest.json")]}, f)
+
+    scraper.run_scrape(stored_version=dict(VERSION, id=1))
+
+    assert scraper.last_run_skipped
+
+def test_journal_replays_parts_in_index_order(tmp_path):
+    from scrape_far import ScrapeJournal
+    journal = ScrapeJournal(str(tmp_path))
+    journal.start(dict(VERSION), ["/far/part-1", "/far/part-2", "/far/part-3"])
+
+    journal.record_part("/far/part-3", {"content": "three"})
+    journal.record_failure("/far/part-2", {"error": "timeout"})
+    journal.record_failure("/far/part-1", {"error": "timeout"})
+    journal.record_part("/far/part-1", {"content": "one"})
+
+    assert list(journal.iter_parts()) == [
+        ("/far/part-1", {"content": "one"}),
+        ("/far/part-2", {"error": "timeout"}),
+        ("/far/part-3", {"content": "three"})
+    ]
+
+def test_scraped_version_keeps_index_order(scraper, monkeypatch):
+    # Parts finish in reverse order, as with concurrent workers
+    links = list(PARTS)
+    monkeypatch.setattr(scraper, "fetch_index", lambda refresh=False: (dict(VERSION), links))
+    scrape_links = scraper.scrape_links
+    monkeypatch.setattr(scraper, "scrape_links", lambda pending, concurrent=True: scrape_links(pending[::-1], False))
+
+    file_path = scraper.run_scrape()
+
+    assert list(scraper.load_far_data(file_path)["parts"]) == links
+
+def test_forced_scrape_ignores_and_clears_the_journal(scraper):
+    scraper.run_scrape()
+    scraped = []
+    scrape_far_part = scraper.scrape_far_part
+    scraper.scrape_far_part = lambda link, structured=None: scraped.append(link) or scrape_far_part(link)
+
+    scraper.run_scrape(force=True)
+
+    assert not scraper.last_run_skipped
+    assert scraped == list(PARTS)
+    assert not os.path.exists(scraper.journal.journal_file)
+
+def test_saved_version_streams_into_storage(scraper, sqlite_storage):
+    far_data = scraper.load_far_data(scraper.run_scrape())
+
+    # Parts are read from the version store on access rather than held in a dict
+    assert not isinstance(far_data["parts"], dict)
+    version_id = sqlite_storage.save_far_data(far_data)
+    assert [part["link"] for part in sqlite_storage.iter_far_parts(version_id)] == list(PARTS)
+    assert "full_text" not in far_data
+    assert "Price analysis." in "".join(scraper.iter_full_text(far_data["version_info"], far_data["parts"].items()))
+
+def test_version_changes_summarize_the_new_version(scraper, monkeypatch):
+    scraper.run_scrape()
+    amended = make_part("52", [("52.212-4", "Contract Terms and Conditions.", "Amended inspection terms.")])
+    monkeypatch.setattr(scraper, "fetch_index",
+                        lambda refresh=False: (dict(VERSION, fac_number="2025-07"), list(PARTS)))
+    monkeypatch.setattr(scraper, "scrape_far_part",
+                        lambda link, structured=None: dict(amended if link == "/far/part-52" else PARTS[link]))
+
+    scraper.run_scrape()
+    changes = scraper.get_version_changes()
+
+    assert changes["fac_number"] == "2025-07"
+    assert changes["changes"]["parts"] == {"added": [], "changed": ["/far/part-52"], "removed": []}
+    assert changes["counts"]["sections"]["changed"] == 1
+
+def test_compaction_moves_legacy_copies_into_the_version_store(scraper):
+    # A scrape saved by the original .txt + .json layout
+    legacy_path = os.path.join(scraper.data_dir, "far_20250101_000000.txt")
+    with open(legacy_path, "w", encoding="utf-8") as f:
+        f.write("legacy text")
+    with open(legacy_path[:-4] + ".json", "w", encoding="utf-8") as f:
+        json.dump({"version_info": dict(VERSION), "parts": PARTS}, f)
+    scraper.update_version_tracking({"version_info": dict(VERSION)}, legacy_path)
+
+    scraper.compact_versions()
+
+    latest = scraper.load_versions()["latest"]
+    assert latest.endswith(".manifest.json")
+    assert not os.path.exists(legacy_path)
+    assert dict(scraper.load_version_parts(latest)) == {
+        link: dict(part, scraped_at=part["scraped_at"]) for link, part in PARTS.items()
+    }
+
+def test_retried_parts_reach_parts_and_text_export(scraper, monkeypatch):
+    attempts = []
+    def flaky_scrape(link, structured=None):
+        attempts.append(link)
+        if link == "/far/part-52" and attempts.count(link) == 1:
+            return {"title": "Error", "url": link, "content": "", "error": "503 Service Unavailable"}
+        return dict(PARTS[link])
+    monkeypatch.setattr(scraper, "scrape_far_part", flaky_scrape)
+
+    far_data = scraper.load_far_data(scraper.run_scrape())
+
+    assert attempts.count("/far/part-52") == 2
+    assert "error" not in far_data["parts"]["/far/part-52"]
+    assert "Inspection terms." in far_data["parts"]["/far/part-52"]["content"]
+    with open(os.path.join(scraper.data_dir, "far_latest.txt"), encoding="utf-8") as f:
+        assert "Inspection terms." in f.read()
+
+def test_retries_follow_the_configured_concurrency(scraper, monkeypatch):
+    from config import Config
+    monkeypatch.setattr(Config, "SCRAPE_CONCURRENT", False)
+    calls = []
+    scrape_links = scraper.scrape_links
+    monkeypatch.setattr(scraper, "scrape_links",
+                        lambda links, concurrent=True: calls.append(concurrent) or scrape_links(links, concurrent))
+    monkeypatch.setattr(scraper, "scrape_far_part", lambda link, structured=None: {
+        "title": "Error", "url": link, "content": "", "error": "503 Service Unavailable"
+    })
+
+    scraper.scrape_to_journal()
+
+    assert calls == [False, False]
+
+def test_part_cache_entries_are_kept_per_parser(tmp_path):
+    from scrape_far import PartCache
+    url = "https://www.acquisition.gov/far/part-15"
+    PartCache(str(tmp_path), "lxml").put(url, {"part": dict(PARTS["/far/part-15"])})
+
+    assert PartCache(str(tmp_path), "lxml").get(url)["part"]["title"] == PARTS["/far/part-15"]["title"]
+    assert PartCache(str(tmp_path), "python").get(url) is None
+
+def test_parts_failing_twice_are_not_saved_and_are_fetched_on_the_next_run(scraper, monkeypatch):
+    attempts = []
+    def failing_scrape(link, structured=None):
+        attempts.append(link)
+        if link == "/far/part-52":
+            return {"title": "Error", "url": link, "content": "", "error": "503 Service Unavailable"}
+        return dict(PARTS[link])
+    monkeypatch.setattr(scraper, "scrape_far_part", failing_scrape)
+
+    with pytest.raises(RuntimeError, match="/far/part-52"):
+        scraper.run_scrape()
+    assert attempts.count("/far/part-52") == 2
+    assert "latest" not in scraper.load_versions()
+
+    # The next run resumes the journal and only fetches the part that failed
+    attempts.clear()
+    monkeypatch.setattr(scraper, "scrape_far_part", lambda link, structured=None: attempts.append(link) or dict(PARTS[link]))
+    far_data = scraper.load_far_data(scraper.run_scrape())
+
+    assert not scraper.last_run_skipped
+    assert attempts == ["/far/part-52"]
+    assert "error" not in far_data["parts"]["/far/part-52"]
+    assert not os.path.exists(scraper.journal.journal_file)
+    assert not os.path.exists(scraper.journal.failed_file)
+
+def test_version_with_failed_parts_is_not_complete(tmp_path):
+    from far_store import VersionStore
+    store = VersionStore(str(tmp_path))
+    failed = {"title": "Error", "url": "/far/part-52", "content": "", "error": "503 Service Unavailable"}
+
+    complete = store.save_version("complete", dict(VERSION), PARTS.items())
+    partial = store.save_version("partial", dict(VERSION), [("/far/part-15", PARTS["/far/part-15"]), ("/far/part-52", failed)])
+
+    assert store.is_complete(complete)
+    assert not store.is_complete(partial)
@@ -0,0 +1,38 @@
+"""
+Tests for the chatbot's section lookup fast path
+"""
+
+import pytest
+
+import simple_chatbot
+from conftest import make_far_data
+
+@pytest.fixture
+def chatbot(sqlite_storage, monkeypatch):
+    monkeypatch.setattr(simple_chatbot, "db_manager", sqlite_storage)
+    sqlite_storage.save_far_data(make_far_data())
+    return simple_chatbot.SimpleFARChatbot()
+
+@pytest.mark.parametrize("question", [
+    "52.212-4",
+    "FAR 52.212-4",
+    "show me FAR 52.212-4",
+    "What is 15.404-1?",
+    "what's 15.404-1?",
+    "What’s FAR 15.404-1",
+    "whats 15.404-1",
+    "Please quote sections 15.404-1 and 52.212-4."
+])
+def test_lookup_questions_take_the_fast_path(chatbot, question):
+    assert chatbot.lookup_sections(question)
+
+@pytest.mark.parametrize("question", [
+    "What does 52.212-4 require of contractors?",
+    "Does 15.404-1 apply to commercial products?",
+    "Compare 15.404-1 with 15.406-2",
+    "what's in 52.212-4 about inspection?",
+    "Show me FAR 99.999",
+    "What are the small business rules?"
+])
+def test_other_questions_fall_through(chatbot, question):
+    assert chatbot.lookup_sections(question) is None
@@ -0,0 +1,281 @@
+"""
+Tests for the storage backends, run against SQLite and (with DATABASE_URL set) PostgreSQL
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+from config import Config
+from conftest import make_far_data, make_part
+from database import DatabaseManager
+from storage import utc_timestamp
+
+OLD_TIMESTAMP = "2000-01-01 00:00:00"
+
+def add_chat_messages(storage, count: int, session_id: str = "session", timestamp: str = None):
+    """Insert chat messages one second apart (or all at timestamp), oldest first"""
+    for i in range(count):
+        storage._execute_insert(storage.CHAT_INSERT_SQL, (
+            session_id, f"question {i}", f"answer {i}", None, 10, timestamp or f"2026-01-01 00:00:{i:02d}"
+        ))
+
+def execute(storage, sql: str):
+    with storage.get_connection() as conn:
+        conn.cursor().execute(sql)
+        conn.commit()
+
+def test_version_hash_ignores_part_order(storage):
+    far_data = make_far_data()
+    reversed_data = dict(far_data, parts=dict(reversed(list(far_data["parts"].items()))))
+
+    assert storage._calculate_hash(far_data) == storage._calculate_hash(reversed_data)
+    assert storage.save_far_data(far_data) == storage.save_far_data(reversed_data)
+
+def test_version_hash_changes_with_content(storage):
+    far_data = make_far_data()
+    changed = make_far_data()
+    changed["parts"]["/far/part-52"]["content"] += " Amended."
+
+    assert storage._calculate_hash(far_data) != storage._calculate_hash(changed)
+
+def test_save_far_data_deduplicates_and_marks_latest(storage):
+    first_id = storage.save_far_data(make_far_data("2025-05"))
+    second_id = storage.save_far_data(make_far_data("2025-06"))
+    assert first_id != second_id
+    assert storage.get_latest_far_version()["id"] == second_id
+
+    # Saving the older version again reuses its row and makes it the latest
+    assert storage.save_far_data(make_far_data("2025-05")) == first_id
+    assert storage.get_latest_far_version()["id"] == first_id
+    assert storage.get_database_stats()["far_data_records"] == 2
+
+def test_saved_parts_and_sections_read_back(storage):
+    version_id = storage.save_far_data(make_far_data())
+
+    part = storage.get_far_part("15")
+    assert part["link"] == "/far/part-15"
+    assert "Price analysis" in part["content"]
+    assert [row["link"] for row in storage.iter_far_parts(version_id)] == ["/far/part-15", "/far/part-52"]
+
+    section = storage.get_far_section("52.212-4")
+    assert section["part_id"] == "52"
+    assert section["text"].startswith("52.212-4 Contract Terms")
+    assert storage.get_far_section("99.999") is None
+
+def test_search_far_ranks_matching_sections(storage):
+    storage.save_far_data(make_far_data())
+
+    results = storage.search_far("inspection acceptance")
+    assert [(hit["kind"], hit["ref_id"]) for hit in results][:1] == [("section", "52.212-4")]
+    assert "<mark>" in results[0]["snippet"]
+
+    assert [hit["ref_id"] for hit in storage.search_far("15.404-1")][:1] == ["15.404-1"]
+    assert storage.search_far("nonexistentterm") == []
+
+def test_search_far_defaults_to_latest_version(storage):
+    storage.save_far_data(make_far_data("2025-05", {
+        "/far/part-9": make_part("9", [("9.104-1", "General standards.", "Responsible prospective contractors.")])
+    }))
+    storage.save_far_data(make_far_data("2025-06"))
+
+    assert storage.search_far("responsible contractors") == []
+
+def test_search_far_covers_parts_without_sections(storage):
+    part = make_part("3", [("3.104", "Procurement integrity.", "Disclosure of contractor bid information.")])
+    del part["structure"]
+    storage.save_far_data(make_far_data(parts={"/far/part-3": part}))
+
+    [hit] = storage.search_far("contractor bid")
+    assert (hit["kind"], hit["ref_id"], hit["part_id"]) == ("part", "/far/part-3", "3")
+
+def test_search_index_follows_deleted_versions(sqlite_storage):
+    old_id = sqlite_storage.save_far_data(make_far_data("2025-05", {
+        "/far/part-9": make_part("9", [("9.104-1", "General standards.", "Responsible prospective contractors.")])
+    }))
+    sqlite_storage.save_far_data(make_far_data("2025-06"))
+    execute(sqlite_storage, f"UPDATE far_data SET scraped_at = '{OLD_TIMESTAMP}'")
+    sqlite_storage.cleanup_old_data(days_to_keep=30)
+
+    # Searching a version that is no longer stored finds nothing, and the latest is still indexed
+    assert sqlite_storage.search_far("responsible contractors", version_id=old_id) == []
+    assert [hit["ref_id"] for hit in sqlite_storage.search_far("inspection")] == ["52.212-4"]
+
+def test_far_text_is_stored_once(sqlite_storage):
+    sqlite_storage.save_far_data(make_far_data())
+
+    with sqlite_storage.get_connection() as conn:
+        assert conn.execute("SELECT full_text FROM far_data").fetchone()[0] == ""
+        # External-content indexes keep no copy of the text
+        shadow_tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE name LIKE '%_content'")}
+        assert shadow_tables == set()
+        assert [row[0] for row in conn.execute("SELECT section_id FROM far_search ORDER BY rowid")] == [
+            "15.404-1", "15.406-2", "52.212-4"
+        ]
+
+def test_keyset_pages_cover_every_row_once(storage):
+    add_chat_messages(storage, 5)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = storage.page_chat_history(limit=2, cursor=cursor)
+        seen += [row["question"] for row in rows]
+        pages += 1
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert seen == [f"question {i}" for i in reversed(range(5))]
+
+def test_keyset_page_is_unaffected_by_rows_added_while_streaming(storage):
+    add_chat_messages(storage, 4)
+
+    rows, cursor = storage.page_chat_history(limit=2)
+    assert not isinstance(rows, list)
+    add_chat_messages(storage, 1, timestamp="2026-01-01 00:00:59")
+    assert [row["question"] for row in rows] == ["question 3", "question 2"]
+
+    rows, cursor = storage.page_chat_history(limit=2, cursor=cursor)
+    assert [row["question"] for row in rows] == ["question 1", "question 0"]
+    assert cursor is None
+
+def test_keyset_pages_filter_by_session(storage):
+    add_chat_messages(storage, 3, session_id="a")
+    add_chat_messages(storage, 2, session_id="b")
+
+    rows, cursor = storage.page_chat_history(session_id="b", limit=2)
+    assert [row["session_id"] for row in rows] == ["b", "b"]
+    assert cursor is None
+
+def test_cleanup_removes_old_rows_but_keeps_latest_version(storage):
+    storage.save_far_data(make_far_data("2025-05"))
+    latest_id = storage.save_far_data(make_far_data("2025-06"))
+    execute(storage, f"UPDATE far_data SET scraped_at = '{OLD_TIMESTAMP}'")
+    add_chat_messages(storage, 2, timestamp=OLD_TIMESTAMP)
+    add_chat_messages(storage, 1, session_id="recent", timestamp=utc_timestamp())
+
+    result = storage.cleanup_old_data(days_to_keep=30)
+
+    assert result == {'far_deleted': 1, 'chat_deleted': 2, 'logs_deleted': 0}
+    assert storage.get_latest_far_version()["id"] == latest_id
+    assert [row["session_id"] for row in storage.get_chat_history()] == ["recent"]
+
+def test_stats_come_from_rollups(storage):
+    storage.save_far_data(make_far_data())
+    add_chat_messages(storage, 3)
+    storage.log_scraping_result(status="success", fac_number="2025-06")
+    storage.log_scraping_result(status="error", error_message="timeout")
+
+    stats = storage.get_database_stats()
+
+    assert stats["far_data_records"] == 1
+    assert stats["chat_messages"] == 3
+    assert stats["scraping_logs"] == 2
+    assert stats["latest_far"]["fac_number"] == "2025-06"
+    assert stats["recent_scraping_success_rate"] == 50
+
+def test_search_highlights_are_html_escaped(storage):
+    storage.save_far_data(make_far_data(parts={
+        "/far/part-1": make_part("1", [("1.101", "Purpose <script>alert(1)</script>.", "Use <b>tags</b> & inspection.")])
+    }))
+
+    [hit] = storage.search_far("inspection")
+
+    assert "<script>" not in hit["title"] and "&lt;script&gt;" in hit["title"]
+    assert "<b>" not in hit["snippet"] and "&amp;" in hit["snippet"]
+    assert "<mark>inspection</mark>" in hit["snippet"]
+
+def test_write_behind_survives_failed_batches(sqlite_storage, monkeypatch):
+    monkeypatch.setattr(Config, "DB_WRITE_BEHIND", True)
+    monkeypatch.setattr(Config, "DB_FLUSH_INTERVAL", 0.01)
+    sqlite_storage.start_write_behind()
+    writer = sqlite_storage.writer
+    write = writer._write
+
+    def fail(rows):
+        raise TypeError("unexpected driver error")
+    writer._write = fail
+    sqlite_storage.save_chat_message("session", "lost", "answer")
+    flushed = threading.Thread(target=sqlite_storage.flush_writes, daemon=True)
+    flushed.start()
+    flushed.join(timeout=5)
+    assert not flushed.is_alive()
+
+    writer._write = write
+    sqlite_storage.save_chat_message("session", "kept", "answer")
+    sqlite_storage.flush_writes()
+    assert [row["question"] for row in sqlite_storage.get_chat_history()] == ["kept"]
+
+class FailingVacuumCursor(sqlite3.Cursor):
+    def execute(self, sql, *args):
+        if sql == "VACUUM":
+            raise sqlite3.OperationalError("database is locked")
+        return super().execute(sql, *args)
+
+class FailingVacuumConnection(sqlite3.Connection):
+    def cursor(self, factory=FailingVacuumCursor):
+        return super().cursor(factory)
+
+def test_failed_vacuum_is_retried_on_next_start(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "far_bot.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE legacy (id INTEGER)")
+    conn.execute("PRAGMA user_version = 4")
+    conn.commit()
+    conn.close()
+
+    connect = sqlite3.connect
+    monkeypatch.setattr(sqlite3, "connect", lambda *args, **kwargs: connect(*args, factory=FailingVacuumConnection, **kwargs))
+    with pytest.raises(sqlite3.OperationalError):
+        DatabaseManager(db_path)
+    monkeypatch.setattr(sqlite3, "connect", connect)
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 4
+    conn.close()
+
+    DatabaseManager(db_path).close()
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == DatabaseManager.SCHEMA_VERSION
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    conn.close()
+
+def test_latest_far_data_copies_do_not_change_the_cache(storage):
+    storage.save_far_data(make_far_data())
+
+    far_data = storage.get_latest_far_data()
+    far_data["fac_number"] = "changed"
+    far_data["parts"].clear()
+    far_data["version_info"]["fac_number"] = "changed"
+
+    cached = storage.get_latest_far_data()
+    assert cached["fac_number"] == "2025-06"
+    assert set(cached["parts"]) == {"/far/part-15", "/far/part-52"}
+    assert cached["version_info"]["fac_number"] == "2025-06"
+
+def test_migration_rebuilds_search_as_external_content(tmp_path):
+    db_path = str(tmp_path / "far_bot.db")
+    storage = DatabaseManager(db_path)
+    storage.save_far_data(make_far_data())
+    storage.close()
+
+    # The version 7 layout: a search index with its own copy of the text, and the full text in far_data
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        DROP TABLE far_search;
+        DROP TABLE far_part_search;
+        CREATE VIRTUAL TABLE far_search USING fts5(title, text, kind UNINDEXED, ref_id UNINDEXED,
+                                                   part_id UNINDEXED, url UNINDEXED, version_id UNINDEXED);
+        UPDATE far_data SET full_text = 'old copy';
+        PRAGMA user_version = 7;
+    """)
+    conn.close()
+
+    storage = DatabaseManager(db_path)
+    try:
+        assert [hit["ref_id"] for hit in storage.search_far("inspection")] == ["52.212-4"]
+        with storage.get_connection() as conn:
+            assert conn.execute("SELECT full_text FROM far_data").fetchone()[0] == ""
+    finally:
+        storage.close()